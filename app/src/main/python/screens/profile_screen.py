@@ -4,6 +4,12 @@ Konwersja z React Native do Python/Kivy z zachowaniem 100% funkcjonalności API
 """
 
 import asyncio
+import hashlib
+import time
+from kivy.clock import Clock
+from kivy.logger import Logger
+from kivy.metrics import dp
+from kivy.utils import escape_markup
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
@@ -18,6 +24,32 @@ from kivymd.uix.gridlayout import MDGridLayout
 from kivymd.toast import toast
 import json
 
+# Wyświetlane statusy kierowcy
+_STATUS_MAP = {
+    'online': '🟢 Online',
+    'offline': '🔴 Offline',
+    'busy': '🟡 Zajęty'
+}
+
+# Pola kart informacyjnych: (klucz w profilu, etykieta)
+_BASIC_FIELDS = (
+    ('name', "Imię i nazwisko"),
+    ('phone', "Telefon"),
+    ('email', "Email"),
+    ('id', "ID kierowcy")
+)
+_VEHICLE_FIELDS = (
+    ('vehicle_model', "Model"),
+    ('vehicle_plate', "Numer rejestracyjny"),
+    ('vehicle_type', "Typ pojazdu"),
+    ('license_number', "Numer licencji"),
+    ('license_expiry', "Ważność licencji")
+)
+# Wartości traktowane jako brak danych - wiersz jest pomijany
+_EMPTY_VALUES = (None, '', 'N/A')
+# Minimalny odstęp między pobraniami profilu (s)
+_PROFILE_TTL = 15
+
 class ProfileScreen(Screen):
     """Ekran profilu kierowcy z danymi z API"""
     
@@ -25,6 +57,19 @@ class ProfileScreen(Screen):
         super().__init__(**kwargs)
         self.api_service = api_service
         self.profile_data = {}
+        # Etykiety wartości (klucz pola -> MDLabel) do aktualizacji w miejscu
+        self.value_labels = {}
+        # Karty czekające na dodanie (jedna na klatkę)
+        self._pending_cards = []
+        self._active_dialog = None
+        # Klucze wierszy widocznych na ekranie (zmiana = przebudowa kart)
+        self._shown_row_keys = None
+        
+        # Hash wyświetlonego profilu - wykrywa brak zmian
+        self._profile_hash = None
+        # Ostatnie udane pobranie (time.monotonic) i trwające żądanie
+        self._last_fetch = None
+        self._load_future = None
         
         # Layout główny
         main_layout = BoxLayout(orientation='vertical')
@@ -32,8 +77,8 @@ class ProfileScreen(Screen):
         # Toolbar
         self.toolbar = MDTopAppBar(
             title="Mój profil",
-            left_action_items=[["arrow-left", lambda x: self.go_back()]],
-            right_action_items=[["refresh", lambda x: self.refresh_profile()]]
+            left_action_items=[["arrow-left", self.go_back]],
+            right_action_items=[["refresh", self.refresh_profile]]
         )
         main_layout.add_widget(self.toolbar)
         
@@ -65,44 +110,85 @@ class ProfileScreen(Screen):
         # Załaduj profil po utworzeniu ekranu
         asyncio.create_task(self.load_profile())
     
-    async def load_profile(self):
-        """Załaduj dane profilu z API"""
+    async def load_profile(self, force=False):
+        """Załaduj dane profilu z API (force=True pomija _PROFILE_TTL)"""
+        # Świeży profil już na ekranie - bez zapytania (chyba że odświeżanie ręczne)
+        if (not force and self.value_labels and self._last_fetch is not None
+                and time.monotonic() - self._last_fetch < _PROFILE_TTL):
+            return
+        
+        # Jedno żądanie naraz - kolejni wywołujący czekają na to samo
+        if not self._is_loading():
+            self._load_future = asyncio.ensure_future(self._do_load())
+        await asyncio.shield(self._load_future)
+    
+    def _is_loading(self):
+        """Czy pobieranie profilu jest w toku"""
+        return self._load_future is not None and not self._load_future.done()
+    
+    async def _do_load(self):
+        """Pobierz profil z API i zaktualizuj ekran"""
         try:
-            print("Ładowanie profilu kierowcy...")
+            Logger.debug("Ładowanie profilu kierowcy...")
             response = await self.api_service.get_driver_profile()
             
             if response.get('success') and response.get('data'):
-                self.profile_data = response['data']
-                self.build_profile_ui()
+                self._last_fetch = time.monotonic()
+                data = response['data']
+                profile_hash = self._profile_digest(data)
+                if profile_hash == self._profile_hash:
+                    # Bez zmian - nie przebudowuj widgetów
+                    return
+                
+                self.profile_data = data
+                self._profile_hash = profile_hash
+                if self.value_labels and self._row_keys() == self._shown_row_keys:
+                    self.update_profile_ui()
+                else:
+                    self.build_profile_ui()
             else:
                 self.show_error("Nie udało się załadować profilu")
                 
         except Exception as error:
-            print(f"Błąd podczas ładowania profilu: {error}")
+            Logger.error("Błąd podczas ładowania profilu: %s", error)
             self.show_error(f"Błąd: {error}")
     
+    @staticmethod
+    def _profile_digest(data):
+        """Hash SHA1 kanonicznego JSON-a profilu"""
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
     def build_profile_ui(self):
         """Zbuduj interfejs profilu na podstawie danych z API"""
         # Usuń loading label
         self.content_layout.clear_widgets()
-        
-        # Dane podstawowe kierowcy
-        self.add_basic_info_card()
-        
-        # Dane pojazdu
-        self.add_vehicle_info_card()
-        
-        # Statystyki
-        self.add_stats_card()
-        
-        # Działania
-        self.add_actions_card()
+        self.value_labels = {}
+        self._shown_row_keys = self._row_keys()
+        
+        # Dane podstawowe, pojazd, statystyki, działania - każda karta w osobnej klatce
+        self._pending_cards = [
+            self.add_basic_info_card,
+            self.add_vehicle_info_card,
+            self.add_stats_card,
+            self.add_actions_card
+        ]
+        self._add_next_card()
+    
+    def _add_next_card(self, dt=None):
+        """Dodaj kolejną kartę i zaplanuj następną na kolejną klatkę"""
+        if not self._pending_cards:
+            return
+        self._pending_cards.pop(0)()
+        if self._pending_cards:
+            Clock.schedule_once(self._add_next_card, 0)
     
     def add_basic_info_card(self):
         """Dodaj kartę z podstawowymi informacjami"""
+        rows = self._basic_info_rows()
         card = MDCard(
             size_hint_y=None,
-            height="200dp",
+            height=dp(60 + 30 * len(rows)),
             elevation=2,
             padding="15dp"
         )
@@ -123,44 +209,21 @@ class ProfileScreen(Screen):
         card_layout.add_widget(header)
         
         # Informacje
-        info_data = [
-            ("Imię i nazwisko", self.profile_data.get('name', 'N/A')),
-            ("Telefon", self.profile_data.get('phone', 'N/A')),
-            ("Email", self.profile_data.get('email', 'N/A')),
-            ("ID kierowcy", str(self.profile_data.get('id', 'N/A'))),
-            ("Status", self.get_status_display())
-        ]
-        
-        for label, value in info_data:
-            item_layout = MDBoxLayout(
-                orientation='horizontal',
-                size_hint_y=None,
-                height="25dp"
-            )
-            
-            label_widget = MDLabel(
-                text=f"{label}:",
-                size_hint_x=0.4,
-                theme_text_color="Secondary"
-            )
-            value_widget = MDLabel(
-                text=str(value),
-                size_hint_x=0.6,
-                theme_text_color="Primary"
-            )
-            
-            item_layout.add_widget(label_widget)
-            item_layout.add_widget(value_widget)
-            card_layout.add_widget(item_layout)
+        self._add_info_rows(card_layout, rows)
         
         card.add_widget(card_layout)
         self.content_layout.add_widget(card)
     
     def add_vehicle_info_card(self):
         """Dodaj kartę z informacjami o pojeździe"""
+        rows = self._vehicle_info_rows()
+        if not rows:
+            # Brak jakichkolwiek danych pojazdu - pomiń kartę
+            return
+        
         card = MDCard(
             size_hint_y=None,
-            height="180dp",
+            height=dp(60 + 30 * len(rows)),
             elevation=2,
             padding="15dp"
         )
@@ -181,38 +244,80 @@ class ProfileScreen(Screen):
         card_layout.add_widget(header)
         
         # Informacje o pojeździe
-        vehicle_data = [
-            ("Model", self.profile_data.get('vehicle_model', 'N/A')),
-            ("Numer rejestracyjny", self.profile_data.get('vehicle_plate', 'N/A')),
-            ("Typ pojazdu", self.profile_data.get('vehicle_type', 'N/A')),
-            ("Numer licencji", self.profile_data.get('license_number', 'N/A')),
-            ("Ważność licencji", self.profile_data.get('license_expiry', 'N/A'))
-        ]
+        self._add_info_rows(card_layout, rows)
         
-        for label, value in vehicle_data:
-            item_layout = MDBoxLayout(
-                orientation='horizontal',
+        card.add_widget(card_layout)
+        self.content_layout.add_widget(card)
+    
+    def _add_info_rows(self, card_layout, rows):
+        """Dodaj wiersze etykieta/wartość - jedna etykieta z markupem na wiersz"""
+        for key, label, value in rows:
+            row = MDLabel(
+                text=self._row_markup(label, value),
+                markup=True,
                 size_hint_y=None,
-                height="25dp"
-            )
-            
-            label_widget = MDLabel(
-                text=f"{label}:",
-                size_hint_x=0.4,
-                theme_text_color="Secondary"
-            )
-            value_widget = MDLabel(
-                text=str(value),
-                size_hint_x=0.6,
+                height="25dp",
                 theme_text_color="Primary"
             )
-            
-            item_layout.add_widget(label_widget)
-            item_layout.add_widget(value_widget)
-            card_layout.add_widget(item_layout)
-        
-        card.add_widget(card_layout)
-        self.content_layout.add_widget(card)
+            self.value_labels[key] = row
+            card_layout.add_widget(row)
+    
+    @staticmethod
+    def _row_markup(label, value):
+        """Tekst wiersza: szara etykieta + pogrubiona wartość"""
+        return f"[color=888888]{label}:[/color] [b]{escape_markup(value)}[/b]"
+    
+    def _present_rows(self, fields):
+        """Wiersze (klucz, etykieta, wartość) tylko dla pól z danymi"""
+        g = self.profile_data.get
+        rows = []
+        for key, label in fields:
+            value = g(key)
+            if value not in _EMPTY_VALUES:
+                rows.append((key, label, str(value)))
+        return rows
+    
+    def _basic_info_rows(self):
+        """Wiersze karty podstawowych informacji: (klucz, etykieta, wartość)"""
+        rows = self._present_rows(_BASIC_FIELDS)
+        rows.append(('status', "Status", self.get_status_display()))
+        return rows
+    
+    def _vehicle_info_rows(self):
+        """Wiersze karty pojazdu: (klucz, etykieta, wartość)"""
+        return self._present_rows(_VEHICLE_FIELDS)
+    
+    def _row_keys(self):
+        """Klucze wierszy kart informacyjnych dla bieżących danych"""
+        return tuple(
+            key for key, _label, _value
+            in self._basic_info_rows() + self._vehicle_info_rows()
+        )
+    
+    def _stats_rows(self):
+        """Wiersze karty statystyk: (klucz, etykieta, wartość)"""
+        g = self.profile_data.get
+        return [
+            ('total_orders', "Łączne zlecenia", str(g('total_orders', 0))),
+            ('average_rating', "Średnia ocena", f"{g('average_rating', 0):.1f} ⭐"),
+            ('experience_years', "Lata doświadczenia", str(g('experience_years', 0))),
+            ('account_status', "Status konta", "Aktywny" if g('status') == 'online' else "Nieaktywny")
+        ]
+    
+    def update_profile_ui(self):
+        """Zaktualizuj teksty istniejących etykiet zamiast przebudowy kart"""
+        labels = self.value_labels
+        for rows in (self._basic_info_rows(), self._vehicle_info_rows()):
+            for key, label, value in rows:
+                widget = labels.get(key)
+                text = self._row_markup(label, value)
+                if widget is not None and widget.text != text:
+                    widget.text = text
+        
+        for key, _label, value in self._stats_rows():
+            widget = labels.get(key)
+            if widget is not None and widget.text != value:
+                widget.text = value
     
     def add_stats_card(self):
         """Dodaj kartę ze statystykami"""
@@ -247,27 +352,21 @@ class ProfileScreen(Screen):
         )
         
         # Statystyki
-        stats_data = [
-            ("Łączne zlecenia", str(self.profile_data.get('total_orders', 0))),
-            ("Średnia ocena", f"{self.profile_data.get('average_rating', 0):.1f} ⭐"),
-            ("Lata doświadczenia", str(self.profile_data.get('experience_years', 0))),
-            ("Status konta", "Aktywny" if self.profile_data.get('status') == 'online' else "Nieaktywny")
-        ]
-        
-        for label, value in stats_data:
+        for key, label, value in self._stats_rows():
             stat_layout = MDBoxLayout(
                 orientation='vertical',
                 spacing="2dp"
             )
             
             value_label = MDLabel(
-                text=str(value),
+                text=value,
                 theme_text_color="Primary",
                 font_style="H6",
                 halign="center",
                 size_hint_y=None,
                 height="30dp"
             )
+            self.value_labels[key] = value_label
             label_label = MDLabel(
                 text=label,
                 theme_text_color="Secondary",
@@ -339,49 +438,57 @@ class ProfileScreen(Screen):
     def get_status_display(self):
         """Pobierz wyświetlany status"""
         status = self.profile_data.get('status', 'offline')
-        status_map = {
-            'online': '🟢 Online',
-            'offline': '🔴 Offline',
-            'busy': '🟡 Zajęty'
-        }
-        return status_map.get(status, f'❓ {status}')
+        return _STATUS_MAP.get(status, f'❓ {status}')
     
     def edit_profile(self, *args):
         """Otwórz edycję profilu"""
-        dialog = MDDialog(
-            title="Edycja profilu",
-            text="Funkcja edycji profilu będzie dostępna wkrótce.",
-            buttons=[
-                MDFlatButton(
-                    text="OK",
-                    on_release=lambda x: dialog.dismiss()
-                )
-            ]
+        self._show_info_dialog(
+            "Edycja profilu",
+            "Funkcja edycji profilu będzie dostępna wkrótce."
         )
-        dialog.open()
     
     def show_settings(self, *args):
         """Pokaż ustawienia"""
-        dialog = MDDialog(
-            title="Ustawienia",
-            text="Panel ustawień będzie dostępny wkrótce.",
+        self._show_info_dialog(
+            "Ustawienia",
+            "Panel ustawień będzie dostępny wkrótce."
+        )
+    
+    def _show_info_dialog(self, title, text):
+        """Pokaż dialog informacyjny z przyciskiem OK"""
+        self._dismiss_dialog()
+        self._active_dialog = MDDialog(
+            title=title,
+            text=text,
             buttons=[
                 MDFlatButton(
                     text="OK",
-                    on_release=lambda x: dialog.dismiss()
+                    on_release=self._dismiss_dialog
                 )
             ]
         )
-        dialog.open()
+        self._active_dialog.open()
+    
+    def _dismiss_dialog(self, *args):
+        """Zamknij aktywny dialog i zwolnij referencję"""
+        dialog, self._active_dialog = self._active_dialog, None
+        if dialog is not None:
+            dialog.dismiss()
     
-    def refresh_profile(self):
+    def refresh_profile(self, *args):
         """Odśwież profil"""
+        if self._is_loading():
+            return
         toast("Odświeżanie profilu...")
-        asyncio.create_task(self.load_profile())
+        asyncio.create_task(self.load_profile(force=True))
     
     def show_error(self, message):
         """Pokaż błąd"""
         self.content_layout.clear_widgets()
+        self.value_labels = {}
+        self._pending_cards = []
+        # Profil zniknął z ekranu - następne pobranie musi go odbudować
+        self._profile_hash = None
         
         error_label = MDLabel(
             text=f"❌ {message}",
@@ -394,13 +501,17 @@ class ProfileScreen(Screen):
             size_hint=(None, None),
             size=("200dp", "40dp"),
             pos_hint={'center_x': 0.5},
-            on_release=lambda x: asyncio.create_task(self.load_profile())
+            on_release=self._retry_load
         )
         
         self.content_layout.add_widget(error_label)
         self.content_layout.add_widget(retry_button)
     
-    def go_back(self):
+    def _retry_load(self, *args):
+        """Ponów ładowanie profilu"""
+        asyncio.create_task(self.load_profile())
+    
+    def go_back(self, *args):
         """Wróć do poprzedniego ekranu"""
         if self.manager:
             self.manager.current = 'home'
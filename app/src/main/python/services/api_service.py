@@ -6,13 +6,92 @@ Dodany lepszy error handling żeby się nie wykładała
 
 import aiohttp
 import asyncio
-import base64
+import binascii
+import collections
+import functools
 import json
 import keyring
+import logging
+import threading
 import traceback
 import time
+from keyring.errors import PasswordDeleteError
 from kivy.logger import Logger
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Final
+
+try:
+    import aiodns  # noqa: F401 - wymagany przez aiohttp.AsyncResolver
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+# Szybki serializer JSON (orjson), jeśli dostępny - zwraca od razu bajty
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(payload) -> bytes:
+        return json.dumps(payload).encode()
+    _json_loads = json.loads
+
+
+# Domyślny adres API - używany też jako adres awaryjny
+_DEFAULT_BASE_URL: Final[str] = 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+
+# Szablony endpointów zleceń - budowane raz przy imporcie modułu
+_EP_ORDER = '/api/driver2/orders/{}'.format
+_EP_ACCEPT = '/api/driver2/orders/{}/accept'.format
+_EP_START = '/api/driver2/orders/{}/start'.format
+_EP_COMPLETE = '/api/driver2/orders/{}/complete'.format
+_EP_CANCEL = '/api/driver2/orders/{}/cancel'.format
+_EP_ORDER_STORAGE = '/api/driver2/order_storage/{}'.format
+
+# Limit czasu dla odpytywanych cyklicznie endpointów - kolejne odpytanie i tak zaraz nastąpi
+_POLL_TIMEOUT: Final[float] = 10.0
+
+
+# Pamięć podręczna keyring: ostatnio odczytana/zapisana wartość klucza (None = brak wpisu)
+_KEYRING_CACHE: Dict[str, Optional[str]] = {}
+_KEYRING_LOCK = threading.Lock()
+
+
+def _keyring_get(key: str) -> Optional[str]:
+    """keyring.get_password z pamięcią podręczną (blokujące)"""
+    with _KEYRING_LOCK:
+        if key in _KEYRING_CACHE:
+            return _KEYRING_CACHE[key]
+    value = keyring.get_password("taxi_driver", key)
+    with _KEYRING_LOCK:
+        _KEYRING_CACHE[key] = value
+    return value
+
+
+def _keyring_set(key: str, value: str) -> None:
+    """keyring.set_password tylko, gdy wartość się zmieniła (blokujące)"""
+    with _KEYRING_LOCK:
+        if key in _KEYRING_CACHE and _KEYRING_CACHE[key] == value:
+            return
+    keyring.set_password("taxi_driver", key, value)
+    with _KEYRING_LOCK:
+        _KEYRING_CACHE[key] = value
+
+
+def _keyring_delete(key: str) -> None:
+    """keyring.delete_password; w pamięci podręcznej klucz zostaje pusty (blokujące)"""
+    with _KEYRING_LOCK:
+        _KEYRING_CACHE[key] = None
+    try:
+        keyring.delete_password("taxi_driver", key)
+    except PasswordDeleteError:
+        pass
+
+
+@functools.lru_cache(maxsize=8)
+def _build_basic_auth(phone: str, password: str) -> str:
+    """Nagłówek Basic auth - te same dane dają ten sam nagłówek, więc liczymy go raz"""
+    token = binascii.b2a_base64(f"{phone}:{password}".encode(), newline=False)
+    return 'Basic ' + token.decode('ascii')
 
 
 class APIConnectionError(Exception):
@@ -34,12 +113,14 @@ class APIService:
     def __init__(self):
         # Stan początkowy - dokładnie jak w React Native
         self.is_logged_in = False
-        self.base_url = 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+        self.base_url = _DEFAULT_BASE_URL
         self.auth_header = None
         self.phone = None
         self.password = None
         self.driver_id = None
-        self.last_endpoint = None
+        
+        # Ostatnie endpointy - tylko do diagnostyki, ograniczona długość
+        self._recent_endpoints = collections.deque(maxlen=16)
         
         # Error handling settings
         self.max_retries = 3
@@ -48,6 +129,16 @@ class APIService:
         self.last_error = None
         self.error_count = 0
         
+        # Circuit breaker - przy awarii API nie męczymy sieci przy każdym odpytaniu
+        self.breaker_threshold = 5
+        self.breaker_cooldown = 30.0
+        self._consec_failures = 0
+        self._breaker_open_until = 0.0
+        
+        # Współdzielona sesja HTTP - jedna na pętlę zdarzeń
+        self._session = None
+        self._session_loop = None
+        
         Logger.info(f'APIService initialized with baseUrl: {self.base_url}')
     
     def _handle_error(self, error: Exception, endpoint: str = "unknown") -> Dict[str, Any]:
@@ -57,8 +148,9 @@ class APIService:
         
         error_msg = str(error)
         Logger.error(f'API Error at {endpoint}: {error_msg}')
-          # Log stack trace for debugging
-        Logger.debug(f'Stack trace: {traceback.format_exc()}')
+        # Log stack trace for debugging (formatowany tylko przy włączonym DEBUG)
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug('Stack trace: %s', traceback.format_exc())
         
         # Return consistent error format
         return {
@@ -68,20 +160,104 @@ class APIService:
             'timestamp': time.time()
         }
     
+    @staticmethod
+    async def _trace_request_start(session, context, params):
+        Logger.debug('API Request: %s %s', params.method, params.url)
+    
+    @staticmethod
+    async def _trace_request_end(session, context, params):
+        Logger.debug('API Response: %s from %s', params.response.status, params.url)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Współdzielona sesja aiohttp powiązana z bieżącą pętlą zdarzeń"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            trace = aiohttp.TraceConfig()
+            trace.on_request_start.append(self._trace_request_start)
+            trace.on_request_end.append(self._trace_request_end)
+            
+            # Resolver c-ares (aiodns) zamiast getaddrinfo w puli wątków, jeśli dostępny
+            connector = aiohttp.TCPConnector(
+                resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+                use_dns_cache=True,
+                ttl_dns_cache=300
+            )
+            
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trace_configs=[trace]
+            )
+            self._session_loop = loop
+        return self._session
+    
+    @staticmethod
+    def _error_message(raw: bytes, status: int) -> str:
+        """Komunikat błędu z ciała odpowiedzi (pole 'error' lub 'message' serwera)"""
+        try:
+            body = _json_loads(raw)
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            return body.get('error') or body.get('message') or f'HTTP {status}'
+        return f'HTTP {status}'
+    
+    async def close(self):
+        """Zamknięcie współdzielonej sesji HTTP"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    def _breaker_admit(self, endpoint: str) -> bool:
+        """Circuit breaker: w oknie przerwy odrzucamy od razu, po oknie puszczamy jedną próbę (zwraca True)"""
+        now = time.monotonic()
+        if now < self._breaker_open_until:
+            raise APIConnectionError(f"Circuit open - API unavailable, skipping {endpoint}")
+        if self._consec_failures >= self.breaker_threshold:
+            self._breaker_open_until = now + self.breaker_cooldown
+            return True
+        return False
+    
+    def _breaker_success(self):
+        """Serwer odpowiedział - obwód zostaje zamknięty"""
+        self._consec_failures = 0
+        self._breaker_open_until = 0.0
+    
+    def _breaker_failure(self) -> bool:
+        """Zlicza błąd sieci/5xx; zwraca True, gdy obwód właśnie się otworzył"""
+        self._consec_failures += 1
+        if self._consec_failures >= self.breaker_threshold:
+            self._breaker_open_until = time.monotonic() + self.breaker_cooldown
+            Logger.warning(f'Circuit breaker opened for {self.breaker_cooldown} seconds')
+            return True
+        return False
+    
     async def _make_request(
         self,
         method: str,
         endpoint: str,
         data: Optional[Dict] = None,
         headers: Optional[Dict] = None,
-        retries: int = None
+        retries: int = None,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """Make HTTP request with error handling and retries"""
         
         if retries is None:
             retries = self.max_retries
         
-        self.last_endpoint = endpoint
+        # Nadpisanie timeoutu tylko dla tego wywołania - sesja zostaje bez zmian
+        # (timeout=None w session.request wyłączyłby limit całkowicie)
+        request_kwargs = {}
+        if timeout is not None:
+            request_kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        
+        if self._breaker_admit(endpoint):
+            retries = 0
+        
+        self._recent_endpoints.append(endpoint)
         url = f"{self.base_url}{endpoint}"
         
         # Prepare headers
@@ -98,41 +274,48 @@ class APIService:
         
         for attempt in range(retries + 1):
             try:
-                Logger.info(f'API Request: {method} {url} (attempt {attempt + 1})')
-                
-                timeout = aiohttp.ClientTimeout(total=self.timeout)
-                
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.request(
-                        method=method,
-                        url=url,
-                        json=data,
-                        headers=request_headers
-                    ) as response:
-                        
-                        # Log response details
-                        Logger.info(f'API Response: {response.status} from {endpoint}')
-                        
-                        try:
-                            response_data = await response.json()
-                        except json.JSONDecodeError:
-                            response_text = await response.text()
-                            Logger.error(f'Invalid JSON response: {response_text}')
-                            raise APIConnectionError(f"Invalid JSON response from {endpoint}")
-                        
-                        if response.status >= 400:
-                            error_msg = response_data.get('error', f'HTTP {response.status}')
-                            
-                            if response.status == 401:
-                                raise APIAuthenticationError(f"Authentication failed: {error_msg}")
-                            else:
-                                raise APIConnectionError(f"API error {response.status}: {error_msg}")
-                        
-                        return response_data
+                session = self._get_session()
+                async with session.request(
+                    method=method,
+                    url=url,
+                    data=_json_dumps(data) if data is not None else None,
+                    headers=request_headers,
+                    **request_kwargs
+                ) as response:
+                    
+                    # Ciało czytamy raz - ponowny odczyt po błędzie parsowania nie jest możliwy
+                    raw = await response.read()
+                    
+                    # 5xx ponawiamy jak błąd sieci (ClientResponseError niżej)
+                    if response.status >= 500:
+                        response.raise_for_status()
+                    
+                    # Błędów klienta nie ponawiamy - serwer odpowiedział, więc obwód zostaje zamknięty
+                    if response.status >= 400:
+                        self._breaker_success()
+                        error_msg = self._error_message(raw, response.status)
+                        if response.status == 401:
+                            raise APIAuthenticationError(f"Authentication failed: {error_msg}")
+                        raise APIConnectionError(f"API error {response.status}: {error_msg}")
+                    
+                    try:
+                        response_data = _json_loads(raw)
+                    except ValueError:
+                        Logger.error(f'Invalid JSON response: {raw[:512]!r}')
+                        raise APIConnectionError(f"Invalid JSON response from {endpoint}")
+                    
+                    self._breaker_success()
+                    return response_data
                         
+            except (APIAuthenticationError, APIConnectionError):
+                raise
+            
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 Logger.warning(f'Request failed (attempt {attempt + 1}): {e}')
                 
+                if self._breaker_failure():
+                    raise APIConnectionError(f"Circuit opened after {self._consec_failures} failures: {str(e)}")
+                
                 if attempt < retries:
                     wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
                     Logger.info(f'Retrying in {wait_time} seconds...')
@@ -181,7 +364,7 @@ class APIService:
     async def check_api_status(self) -> bool:
         """Check if API is available"""
         try:
-            response = await self._make_request('GET', '/api/health', retries=1)
+            response = await self._make_request('GET', '/api/health', retries=1, timeout=3)
             return True
         except Exception as e:
             Logger.warning(f'API health check failed: {e}')
@@ -197,11 +380,20 @@ class APIService:
         except Exception as e:
             return self._handle_error(e, "connection_check")
     
+    @staticmethod
+    async def _in_thread(func, *args):
+        """Blokujące wywołanie (keyring = IPC do magazynu haseł) w puli wątków - poza pętlą UI"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    @staticmethod
+    def read_saved_credentials():
+        """Odczyt telefonu i hasła z keyring (blokujące - _in_thread albo wątek roboczy)"""
+        return _keyring_get("phone"), _keyring_get("password")
+    
     async def load_saved_credentials(self) -> Optional[Dict[str, str]]:
         """Ładowanie zapisanych danych logowania - jak w React Native"""
         try:
-            saved_phone = keyring.get_password("taxi_driver", "phone")
-            saved_password = keyring.get_password("taxi_driver", "password")
+            saved_phone, saved_password = await self._in_thread(self.read_saved_credentials)
             
             if saved_phone and saved_password:
                 Logger.info('Znaleziono zapisane dane logowania, inicjalizacja sesji...')
@@ -225,18 +417,30 @@ class APIService:
             Logger.error(f'Błąd podczas autologowania: {error}')
             return {"success": False, "message": f"Błąd podczas autologowania: {error}"}
     
+    @staticmethod
+    def _write_credentials(phone: str, password: str, url: Optional[str]):
+        """Zapis danych logowania do keyring (blokujące - wywoływać przez _in_thread)"""
+        # Niezmienione wartości (np. autologowanie) nie są zapisywane ponownie
+        _keyring_set("phone", phone)
+        _keyring_set("password", password)
+        if url:
+            _keyring_set("api_url", url)
+    
+    @staticmethod
+    def _delete_credentials():
+        """Usunięcie telefonu i hasła z keyring (blokujące - wywoływać przez _in_thread)"""
+        _keyring_delete("phone")
+        _keyring_delete("password")
+    
     async def save_credentials(self, phone: str, password: str, base_url: str = None):
         """Zapisywanie danych logowania i adresu URL"""
         try:
-            keyring.set_password("taxi_driver", "phone", phone)
-            keyring.set_password("taxi_driver", "password", password)
-            
             # Zapisz adres URL, jeśli podany
             url_to_save = base_url or self.base_url
+            await self._in_thread(self._write_credentials, phone, password, url_to_save)
+            
             if url_to_save:
-                keyring.set_password("taxi_driver", "api_url", url_to_save)
                 Logger.info(f'Zapisano adres API: {url_to_save}')
-            
             Logger.info('Dane logowania zostały zapisane')
         except Exception as error:
             Logger.error(f'Błąd podczas zapisywania danych logowania: {error}')
@@ -244,7 +448,7 @@ class APIService:
     async def load_saved_api_url(self) -> Optional[str]:
         """Wczytywanie zapisanego adresu URL"""
         try:
-            saved_url = keyring.get_password("taxi_driver", "api_url")
+            saved_url = await self._in_thread(_keyring_get, "api_url")
             if saved_url:
                 Logger.info(f'Wczytano zapisany adres API: {saved_url}')
                 self.base_url = saved_url
@@ -274,7 +478,7 @@ class APIService:
             Logger.info(f'Zmiana adresu bazowego API na: {formatted_url}')
             
             # Zapisujemy nowy URL
-            keyring.set_password("taxi_driver", "api_url", formatted_url)
+            await self._in_thread(_keyring_set, "api_url", formatted_url)
             
             # Aktualizujemy lokalny URL
             self.base_url = formatted_url
@@ -290,12 +494,10 @@ class APIService:
         self.password = password
         
         # Używamy podanego URL lub domyślnego
-        self.base_url = base_url or 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+        self.base_url = base_url or _DEFAULT_BASE_URL
         
         # Tworzymy nagłówek autoryzacji
-        credentials = f"{phone}:{password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.auth_header = f'Basic {encoded_credentials}'
+        self.auth_header = _build_basic_auth(phone, password)
         
         Logger.info(f'API Service initialized with phone: {phone} and baseUrl: {self.base_url}')
     
@@ -303,7 +505,7 @@ class APIService:
         """Pobieranie bazowego adresu URL API"""
         if not self.base_url:
             Logger.warning('baseUrl nie jest zdefiniowany, używam domyślnego')
-            return 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+            return _DEFAULT_BASE_URL
         
         # Usuwamy ewentualny końcowy slash
         if self.base_url.endswith('/'):
@@ -319,32 +521,61 @@ class APIService:
         self.phone = None
         self.password = None
         self.driver_id = None
-        self.last_endpoint = None
+        self._recent_endpoints.clear()
     
-    async def _fetch_with_logging(self, url: str, options: Dict) -> Dict:
-        """Podstawowe zapytanie HTTP z obsługą błędów i logowaniem"""
-        method = options.get('method', 'GET')
-        Logger.info(f'API Request: {method} {url}')
+    async def _fetch_with_logging(
+        self,
+        url: str,
+        options: Dict,
+        retries: int = 0,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """Podstawowe zapytanie HTTP z obsługą błędów i logowaniem (circuit breaker i ponowienia jak w _make_request)"""
+        options = dict(options)
+        method = options.pop('method', 'GET')
+        Logger.debug('API Request: %s %s', method, url)
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(method, url, **options) as response:
-                    content_type = response.headers.get('content-type', '')
+        if timeout is not None:
+            options['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        
+        if self._breaker_admit(url):
+            retries = 0
+        
+        for attempt in range(retries + 1):
+            try:
+                # Współdzielona sesja - bez nowego połączenia TCP/TLS przy każdym zapytaniu
+                async with self._get_session().request(method, url, **options) as response:
+                    # 5xx ponawiamy jak błąd sieci; każda inna odpowiedź zamyka obwód
+                    if response.status >= 500:
+                        response.raise_for_status()
+                    self._breaker_success()
                     
-                    if 'application/json' in content_type:
-                        data = await response.json()
-                        Logger.info(f'API Response (json): {data}')
+                    if response.content_type == 'application/json':
+                        raw = await response.read()
+                        data = _json_loads(raw)
+                        Logger.debug('API Response (json) status=%s size=%d', response.status, len(raw))
                         return {"response": response, "data": data}
                     else:
                         text = await response.text()
-                        Logger.info(f'API Response (text): {text}')
+                        Logger.debug('API Response (text) status=%s size=%d', response.status, len(text))
                         return {
                             "response": response, 
                             "data": {"success": response.ok, "message": text}
                         }
-        except Exception as error:
-            Logger.error(f'API Error: {error}')
-            raise error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                Logger.warning(f'Request failed (attempt {attempt + 1}): {error}')
+                if self._breaker_failure():
+                    raise APIConnectionError(f"Circuit opened after {self._consec_failures} failures: {error}")
+                if attempt < retries:
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                    continue
+                Logger.error(f'API Error: {error}')
+                raise
+            except Exception as error:
+                Logger.error(f'API Error: {error}')
+                raise
+        
+        raise APIConnectionError("Request failed for unknown reason")
     
     async def _auth_fetch(self, endpoint: str, options: Dict = None) -> Dict:
         """Podstawowe zapytanie z autoryzacją"""
@@ -358,7 +589,7 @@ class APIService:
             
             if not self.base_url:
                 Logger.warning('Brak baseUrl. Używam adresu awaryjnego.')
-                self.base_url = 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+                self.base_url = _DEFAULT_BASE_URL
             
             # Pełny URL
             url = f"{self.base_url}{endpoint}"
@@ -371,15 +602,37 @@ class APIService:
             
             # Konwertuj dane na JSON jeśli są
             if 'json' in options:
-                options['data'] = json.dumps(options.pop('json'))
+                options['data'] = _json_dumps(options.pop('json'))
             
-            result = await self._fetch_with_logging(url, options)
+            # Ponawiamy tylko GET - akcje na zleceniach nie są idempotentne
+            retries = self.max_retries if options.get('method', 'GET') == 'GET' else 0
+            result = await self._fetch_with_logging(url, options, retries=retries)
             return result.get('data', {})
             
         except Exception as error:
             Logger.error(f'Błąd w _auth_fetch: {error}')
             return {"success": False, "message": str(error)}
     
+    async def _auth_get(self, endpoint: str, timeout: Optional[float] = None) -> Dict:
+        """Zapytanie GET z autoryzacją - jak _auth_fetch, ale bez obsługi opcji i ciała"""
+        if not self.is_logged_in:
+            Logger.warning('Użytkownik nie jest zalogowany. Próba użycia _auth_get bez logowania.')
+            return {"success": False, "message": "Nie zalogowano"}
+        
+        if not self.base_url:
+            Logger.warning('Brak baseUrl. Używam adresu awaryjnego.')
+            self.base_url = _DEFAULT_BASE_URL
+        
+        try:
+            result = await self._fetch_with_logging(f"{self.base_url}{endpoint}", {
+                'method': 'GET',
+                'headers': {'Authorization': self.auth_header}
+            }, retries=self.max_retries, timeout=timeout)
+            return result.get('data', {})
+        except Exception as error:
+            Logger.error(f'Błąd w _auth_get: {error}')
+            return {"success": False, "message": str(error)}
+    
     # === LOGOWANIE ===
     async def login(self, phone: str, password: str, base_url: str = None) -> Dict[str, Any]:
         """
@@ -391,7 +644,7 @@ class APIService:
             login_base_url = base_url or self.base_url
             
             if not login_base_url:
-                login_base_url = 'https://e6db2f06-15c4-4633-bd30-7fbd9c8200b1-00-l2xqyupphiyt.riker.replit.dev'
+                login_base_url = _DEFAULT_BASE_URL
             
             # Inicjalizujemy serwis z danymi logowania
             self.initialize(phone, password, login_base_url)
@@ -410,7 +663,7 @@ class APIService:
             result = await self._fetch_with_logging(login_url, {
                 'method': 'GET',
                 'headers': headers
-            })
+            }, retries=self.max_retries)
             
             response_data = result.get('data', {})
             
@@ -453,12 +706,11 @@ class APIService:
             if self.is_logged_in:
                 await self._auth_fetch('/api/driver2/logout', {'method': 'POST'})
             
-            # Wyczyść dane logowania
+            # Wyczyść dane logowania (także z pamięci podręcznej keyring)
             try:
-                keyring.delete_password("taxi_driver", "phone")
-                keyring.delete_password("taxi_driver", "password")
-            except:
-                pass
+                await self._in_thread(self._delete_credentials)
+            except Exception as error:
+                Logger.warning(f'Nie udało się usunąć danych logowania: {error}')
             
             # Resetuj stan
             self.reset()
@@ -476,7 +728,7 @@ class APIService:
         Endpoint: /api/driver2/profile
         """
         try:
-            response = await self._auth_fetch('/api/driver2/profile')
+            response = await self._auth_get('/api/driver2/profile')
             
             if response.get('success') and response.get('data'):
                 return {"success": True, "data": response['data']}
@@ -522,9 +774,9 @@ class APIService:
         try:
             Logger.info('Sprawdzanie puli zleceń dla testowego kierowcy (ID: 15)...')
             
-            response = await self._auth_fetch('/api/driver2/15/pool')
+            response = await self._auth_get('/api/driver2/15/pool', timeout=_POLL_TIMEOUT)
             
-            Logger.info(f'Odpowiedź API dla puli zleceń: {response}')
+            Logger.debug('Odpowiedź API dla puli zleceń: success=%s', response.get('success'))
             
             if response.get('success') and isinstance(response.get('data'), list):
                 Logger.info(f'Znaleziono {len(response["data"])} zleceń w puli kierowcy')
@@ -549,7 +801,7 @@ class APIService:
         Endpoint: /api/driver2/orders/current
         """
         try:
-            response = await self._auth_fetch('/api/driver2/orders/current')
+            response = await self._auth_get('/api/driver2/orders/current', timeout=_POLL_TIMEOUT)
             
             if response.get('success') and isinstance(response.get('data'), list):
                 return {"success": True, "data": response['data']}
@@ -569,7 +821,7 @@ class APIService:
         Endpoint: /api/driver2/orders/{order_id}/accept
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/orders/{order_id}/accept', {
+            response = await self._auth_fetch(_EP_ACCEPT(order_id), {
                 'method': 'POST'
             })
             
@@ -588,7 +840,7 @@ class APIService:
         Endpoint: /api/driver2/orders/{order_id}/start
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/orders/{order_id}/start', {
+            response = await self._auth_fetch(_EP_START(order_id), {
                 'method': 'POST'
             })
             
@@ -606,7 +858,7 @@ class APIService:
         Endpoint: /api/driver2/orders/{order_id}/complete
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/orders/{order_id}/complete', {
+            response = await self._auth_fetch(_EP_COMPLETE(order_id), {
                 'method': 'POST'
             })
             
@@ -624,7 +876,7 @@ class APIService:
         Endpoint: /api/driver2/orders/{order_id}/cancel
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/orders/{order_id}/cancel', {
+            response = await self._auth_fetch(_EP_CANCEL(order_id), {
                 'method': 'POST',
                 'json': {"reason": reason}
             })
@@ -644,7 +896,7 @@ class APIService:
         Endpoint: /api/driver2/orders/{order_id}
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/orders/{order_id}')
+            response = await self._auth_get(_EP_ORDER(order_id))
             
             if response.get('success'):
                 return {"success": True, "data": response.get('data')}
@@ -660,7 +912,7 @@ class APIService:
         Endpoint: /api/driver2/order_storage/{order_id}
         """
         try:
-            response = await self._auth_fetch(f'/api/driver2/order_storage/{order_id}')
+            response = await self._auth_get(_EP_ORDER_STORAGE(order_id))
             
             if response.get('success'):
                 return {"success": True, "data": response.get('data')}
@@ -731,3 +983,38 @@ class APIService:
         except Exception as error:
             Logger.error(f'Błąd aktualizacji lokalizacji: {error}')
             return {"success": False, "message": str(error)}
+    
+    async def update_locations_batch(self, points: List[tuple], status: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Wysyłka wielu punktów lokalizacji jednym zapytaniem
+        Endpoint: /api/driver2/location/batch
+        points: lista krotek (latitude, longitude, accuracy, timestamp)
+        status: opcjonalny nowy status kierowcy wysyłany w tym samym zapytaniu
+        """
+        payload = {
+            "points": [
+                {
+                    "latitude": lat,
+                    "longitude": lon,
+                    "accuracy": accuracy,
+                    "timestamp": timestamp
+                }
+                for lat, lon, accuracy, timestamp in points
+            ]
+        }
+        if status is not None:
+            payload["status"] = status
+        
+        try:
+            response = await self._auth_fetch('/api/driver2/location/batch', {
+                'method': 'POST',
+                'json': payload
+            })
+            
+            if response.get('success'):
+                return {"success": True, "count": len(points)}
+            else:
+                return {"success": False, "message": response.get('message', 'Błąd aktualizacji lokalizacji')}
+        except Exception as error:
+            Logger.error(f'Błąd wysyłki paczki lokalizacji: {error}')
+            return {"success": False, "message": str(error)}
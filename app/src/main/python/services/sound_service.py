@@ -27,6 +27,10 @@ except ImportError as e:
     Logger.warning(f"Kivy SoundLoader not available: {e}")
 
 
+# Znacznik braku dźwięku w słowniku (jedno wyszukiwanie zamiast dwóch)
+_MISSING = object()
+
+
 class SoundServiceError(Exception):
     """Custom exception for sound service errors"""
     def __init__(self, message: str, sound_name: str = None):
@@ -36,6 +40,19 @@ class SoundServiceError(Exception):
 class SoundService(EventDispatcher):
     """Usługa obsługi dźwięków powiadomień z kompletnym error handlingiem"""
     
+    # Dźwięki ładowane z wyprzedzeniem (w tle) - reszta przy pierwszym użyciu
+    preload_sounds = ('new_order', 'order_accepted', 'order_completed')
+    
+    # Mapowanie dźwięków (stałe dla wszystkich instancji)
+    sound_files = {
+        'new_order': 'new_order.wav',
+        'order_accepted': 'order_accepted.wav',
+        'order_completed': 'order_completed.wav',
+        'message': 'message.wav',
+        'notification': 'notification.wav',
+        'error': 'error.wav'
+    }
+    
     def __init__(self, assets_path=None):
         super().__init__()
         self.assets_path = assets_path or "assets/sounds"
@@ -49,137 +66,188 @@ class SoundService(EventDispatcher):
         self.error_count = 0
         self.max_error_count = 10
         self.failed_sounds = set()
-        
-        # Mapowanie dźwięków
-        self.sound_files = {
-            'new_order': 'new_order.wav',
-            'order_accepted': 'order_accepted.wav', 
-            'order_completed': 'order_completed.wav',
-            'message': 'message.wav',
-            'notification': 'notification.wav',
-            'error': 'error.wav'
-        }
+        # Nazwa -> True gdy w self.sounds jest załadowany obiekt Kivy Sound
+        self._is_kivy_sound = {}
         
         # Bezpieczna inicjalizacja
         self.safe_initialize()
     
+    def safe_initialize(self):
+        """Uruchom initialize() w działającej pętli asyncio (lub od razu)"""
+        try:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self.initialize())
+            else:
+                asyncio.ensure_future(self.initialize())
+        except Exception as e:
+            Logger.error("Błąd uruchamiania inicjalizacji SoundService: %s", e)
+            self._create_mock_sounds()
+            self.is_initialized = True
+    
     async def initialize(self):
         """Inicjalizuj usługę dźwięku"""
         try:
-            print("Inicjalizacja SoundService...")
+            Logger.debug("Inicjalizacja SoundService...")
             
             # Sprawdź czy folder z dźwiękami istnieje
             if not os.path.exists(self.assets_path):
-                print(f"Folder dźwięków {self.assets_path} nie istnieje - tworzę symulację")
+                Logger.warning("Folder dźwięków %s nie istnieje - tworzę symulację", self.assets_path)
                 self._create_mock_sounds()
                 self.is_initialized = True
                 return
             
-            # Załaduj pliki dźwiękowe
+            # Zarejestruj ścieżki plików - dekodowanie dopiero przy pierwszym odtworzeniu
             for sound_name, filename in self.sound_files.items():
                 filepath = os.path.join(self.assets_path, filename)
                 
                 if os.path.exists(filepath):
-                    if HAS_KIVY_AUDIO:
-                        try:
-                            sound = SoundLoader.load(filepath)
-                            if sound:
-                                sound.volume = self.volume
-                                self.sounds[sound_name] = sound
-                                print(f"Załadowano dźwięk: {sound_name}")
-                            else:
-                                print(f"Nie udało się załadować: {filepath}")
-                        except Exception as e:
-                            print(f"Błąd ładowania {filepath}: {e}")
-                    else:
-                        # Fallback - zapisz ścieżkę do pliku
-                        self.sounds[sound_name] = filepath
-                        print(f"Zarejestrowano ścieżkę dźwięku: {sound_name}")
+                    self.sounds[sound_name] = filepath
+                    Logger.debug("Zarejestrowano ścieżkę dźwięku: %s", sound_name)
                 else:
-                    print(f"Plik dźwiękowy nie istnieje: {filepath}")
+                    Logger.warning("Plik dźwiękowy nie istnieje: %s", filepath)
             
+            # Gotowy do odtwarzania - preload poniżej tylko przyspiesza pierwsze użycie
             self.is_initialized = True
-            print(f"SoundService zainicjalizowany. Załadowano {len(self.sounds)} dźwięków.")
+            
+            # Dekodowanie dźwięków zleceń w wątku roboczym
+            if HAS_KIVY_AUDIO:
+                pending = [
+                    (sound_name, self.sounds[sound_name])
+                    for sound_name in self.preload_sounds
+                    if isinstance(self.sounds.get(sound_name), str)
+                ]
+                # Wszystkie pliki równolegle - czas ~ najwolniejszy plik, nie suma
+                results = await asyncio.gather(
+                    *[self._preload_one(filepath) for _name, filepath in pending],
+                    return_exceptions=True
+                )
+                for (sound_name, filepath), sound in zip(pending, results):
+                    if isinstance(sound, Exception):
+                        Logger.error("Błąd ładowania %s: %s", filepath, sound)
+                        continue
+                    # Mogło już zostać załadowane przy odtworzeniu
+                    if sound and self.sounds.get(sound_name) == filepath:
+                        sound.volume = self.volume
+                        self.sounds[sound_name] = sound
+                        self._is_kivy_sound[sound_name] = True
+                        Logger.debug("Załadowano dźwięk: %s", sound_name)
+            
+            Logger.info("SoundService zainicjalizowany. Zarejestrowano %s dźwięków.", len(self.sounds))
             
         except Exception as e:
-            print(f"Błąd inicjalizacji SoundService: {e}")
+            Logger.error("Błąd inicjalizacji SoundService: %s", e)
             self._create_mock_sounds()
             self.is_initialized = True
     
+    async def _preload_one(self, filepath):
+        """Zdekoduj plik dźwiękowy w wątku roboczym"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, SoundLoader.load, filepath)
+    
+    def _load_sound(self, sound_name, filepath):
+        """Załaduj dźwięk przez SoundLoader; przy błędzie zwróć ścieżkę"""
+        try:
+            sound = SoundLoader.load(filepath)
+        except Exception as e:
+            Logger.error("Błąd ładowania %s: %s", filepath, e)
+            sound = None
+        
+        if not sound:
+            Logger.warning("Nie udało się załadować: %s", filepath)
+            self.failed_sounds.add(sound_name)
+            return filepath
+        
+        sound.volume = self.volume
+        self.sounds[sound_name] = sound
+        self._is_kivy_sound[sound_name] = True
+        Logger.debug("Załadowano dźwięk: %s", sound_name)
+        return sound
+    
     def _create_mock_sounds(self):
         """Utwórz symulowane dźwięki"""
         for sound_name in self.sound_files.keys():
             self.sounds[sound_name] = "mock_sound"
-        print("Utworzono symulowane dźwięki")
+        self._is_kivy_sound.clear()
+        Logger.debug("Utworzono symulowane dźwięki")
     
-    async def play_sound(self, sound_name):
+    def play_sound(self, sound_name):
         """Odtwórz dźwięk o podanej nazwie"""
         try:
             if not self.is_initialized:
-                print("SoundService nie został jeszcze zainicjalizowany")
+                Logger.warning("SoundService nie został jeszcze zainicjalizowany")
                 return False
             
-            if sound_name not in self.sounds:
-                print(f"Dźwięk '{sound_name}' nie jest dostępny")
+            sound = self.sounds.get(sound_name, _MISSING)
+            if sound is _MISSING:
+                Logger.warning("Dźwięk '%s' nie jest dostępny", sound_name)
                 return False
             
-            sound = self.sounds[sound_name]
+            # Szybka ścieżka - załadowany dźwięk Kivy
+            if self._is_kivy_sound.get(sound_name):
+                sound.play()
+                Logger.debug("🔊 Odtwarzam dźwięk: %s", sound_name)
+                return True
             
             if sound == "mock_sound":
-                print(f"🔊 Symulacja odtwarzania dźwięku: {sound_name}")
+                Logger.debug("🔊 Symulacja odtwarzania dźwięku: %s", sound_name)
                 return True
             
-            if HAS_KIVY_AUDIO and hasattr(sound, 'play'):
-                # Kivy SoundLoader
-                sound.play()
-                print(f"🔊 Odtwarzam dźwięk: {sound_name}")
-                return True
+            # Pierwsze odtworzenie - załaduj plik przez Kivy
+            if (HAS_KIVY_AUDIO and isinstance(sound, str)
+                    and sound_name not in self.failed_sounds):
+                sound = self._load_sound(sound_name, sound)
+                if self._is_kivy_sound.get(sound_name):
+                    sound.play()
+                    Logger.debug("🔊 Odtwarzam dźwięk: %s", sound_name)
+                    return True
             
-            elif isinstance(sound, str) and os.path.exists(sound):
+            if isinstance(sound, str) and os.path.exists(sound):
                 # Fallback - spróbuj użyć Plyer
                 if HAS_AUDIO:
                     try:
                         audio.play(sound)
-                        print(f"🔊 Odtwarzam dźwięk przez Plyer: {sound_name}")
+                        Logger.debug("🔊 Odtwarzam dźwięk przez Plyer: %s", sound_name)
                         return True
                     except Exception as e:
-                        print(f"Błąd Plyer audio: {e}")
+                        Logger.error("Błąd Plyer audio: %s", e)
                 
                 # Ostatni fallback - print
-                print(f"🔊 Symulacja dźwięku: {sound_name} ({sound})")
+                Logger.debug("🔊 Symulacja dźwięku: %s (%s)", sound_name, sound)
                 return True
             
             else:
-                print(f"Nie można odtworzyć dźwięku: {sound_name}")
+                Logger.warning("Nie można odtworzyć dźwięku: %s", sound_name)
                 return False
                 
         except Exception as e:
-            print(f"Błąd odtwarzania dźwięku '{sound_name}': {e}")
+            Logger.error("Błąd odtwarzania dźwięku '%s': %s", sound_name, e)
             return False
     
-    async def play_new_order_sound(self):
+    def play_new_order_sound(self):
         """Odtwórz dźwięk nowego zlecenia"""
-        return await self.play_sound('new_order')
+        return self.play_sound('new_order')
     
-    async def play_order_accepted_sound(self):
+    def play_order_accepted_sound(self):
         """Odtwórz dźwięk akceptacji zlecenia"""
-        return await self.play_sound('order_accepted')
+        return self.play_sound('order_accepted')
     
-    async def play_order_completed_sound(self):
+    def play_order_completed_sound(self):
         """Odtwórz dźwięk ukończenia zlecenia"""
-        return await self.play_sound('order_completed')
+        return self.play_sound('order_completed')
     
-    async def play_message_sound(self):
+    def play_message_sound(self):
         """Odtwórz dźwięk nowej wiadomości"""
-        return await self.play_sound('message')
+        return self.play_sound('message')
     
-    async def play_notification_sound(self):
+    def play_notification_sound(self):
         """Odtwórz dźwięk powiadomienia"""
-        return await self.play_sound('notification')
+        return self.play_sound('notification')
     
-    async def play_error_sound(self):
+    def play_error_sound(self):
         """Odtwórz dźwięk błędu"""
-        return await self.play_sound('error')
+        return self.play_sound('error')
     
     def set_volume(self, volume):
         """Ustaw głośność (0.0 - 1.0)"""
@@ -190,7 +258,7 @@ class SoundService(EventDispatcher):
             if HAS_KIVY_AUDIO and hasattr(sound, 'volume'):
                 sound.volume = self.volume
         
-        print(f"Ustawiono głośność na: {self.volume}")
+        Logger.debug("Ustawiono głośność na: %s", self.volume)
     
     def get_volume(self):
         """Pobierz aktualną głośność"""
@@ -212,24 +280,27 @@ class SoundService(EventDispatcher):
         """Pobierz listę dostępnych dźwięków"""
         return list(self.sounds.keys())
     
-    def preload_sound(self, sound_name, filepath):
-        """Załaduj dźwięk z podanej ścieżki"""
+    async def preload_sound(self, sound_name, filepath):
+        """Załaduj dźwięk z podanej ścieżki (dekodowanie w wątku roboczym)"""
         try:
             if HAS_KIVY_AUDIO:
-                sound = SoundLoader.load(filepath)
+                loop = asyncio.get_running_loop()
+                sound = await loop.run_in_executor(None, SoundLoader.load, filepath)
                 if sound:
                     sound.volume = self.volume
                     self.sounds[sound_name] = sound
-                    print(f"Załadowano dźwięk: {sound_name} z {filepath}")
+                    self._is_kivy_sound[sound_name] = True
+                    Logger.debug("Załadowano dźwięk: %s z %s", sound_name, filepath)
                     return True
             else:
                 # Fallback
                 self.sounds[sound_name] = filepath
-                print(f"Zarejestrowano ścieżkę: {sound_name} -> {filepath}")
+                self._is_kivy_sound.pop(sound_name, None)
+                Logger.debug("Zarejestrowano ścieżkę: %s -> %s", sound_name, filepath)
                 return True
                 
         except Exception as e:
-            print(f"Błąd ładowania dźwięku {sound_name}: {e}")
+            Logger.error("Błąd ładowania dźwięku %s: %s", sound_name, e)
         
         return False
     
@@ -241,8 +312,9 @@ class SoundService(EventDispatcher):
                     sound.stop()
             
             self.sounds.clear()
+            self._is_kivy_sound.clear()
             self.is_initialized = False
-            print("SoundService wyczyszczony")
+            Logger.debug("SoundService wyczyszczony")
             
         except Exception as e:
-            print(f"Błąd czyszczenia SoundService: {e}")
+            Logger.error("Błąd czyszczenia SoundService: %s", e)
@@ -4,7 +4,8 @@ Simple Taxi Driver App - Core Functionality
 Compatible with Chaquopy for Android compilation
 """
 
-import requests
+import aiohttp
+import asyncio
 import json
 import time
 from typing import Dict, List, Optional
@@ -12,22 +13,57 @@ from typing import Dict, List, Optional
 class TaxiDriverAPI:
     """Simple API service for taxi driver operations"""
     
+    RETRY_STATUSES = (502, 503, 504)
+    ORDERS_TTL = 5  # seconds
+    
     def __init__(self, base_url: str = "http://your-server.com/api"):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session: Optional[aiohttp.ClientSession] = None
         self.driver_id = None
         self.auth_token = None
+        self._orders_cache_key = None
+        self._orders_cache: List[Dict] = []
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create one pooled keep-alive session"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={'Accept-Encoding': 'gzip'}
+            )
+        return self.session
+    
+    async def _request(self, method: str, path: str, **kwargs):
+        """Send a request, retrying gateway errors with backoff; returns (status, json or None)"""
+        # Per request, not on the session - a recreated session would lose it
+        if self.auth_token:
+            kwargs.setdefault('headers', {})['Authorization'] = f"Bearer {self.auth_token}"
+        session = self._get_session()
+        for attempt in range(4):
+            async with session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+                if response.status in self.RETRY_STATUSES and attempt < 3:
+                    await asyncio.sleep(0.3 * (2 ** attempt))
+                    continue
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.json(content_type=None)
     
-    def login(self, username: str, password: str) -> bool:
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+    
+    async def login(self, username: str, password: str) -> bool:
         """Login driver and get auth token"""
         try:
-            response = self.session.post(f"{self.base_url}/driver/login", {
+            status, data = await self._request('POST', "/driver/login", data={
                 "username": username,
                 "password": password
             })
             
-            if response.status_code == 200:
-                data = response.json()
+            if status == 200:
                 self.auth_token = data.get("token")
                 self.driver_id = data.get("driver_id")
                 return True
@@ -36,51 +72,55 @@ class TaxiDriverAPI:
             print(f"Login error: {e}")
             return False
     
-    def get_orders(self) -> List[Dict]:
+    async def get_orders(self) -> List[Dict]:
         """Get available orders"""
         if not self.auth_token:
             return []
         
+        # Results are reused within the same 5 second window for the same token
+        cache_key = (self.auth_token, int(time.time() // self.ORDERS_TTL))
+        if cache_key == self._orders_cache_key:
+            return self._orders_cache
+        
         try:
-            headers = {"Authorization": f"Bearer {self.auth_token}"}
-            response = self.session.get(f"{self.base_url}/driver/orders", headers=headers)
+            status, data = await self._request('GET', "/driver/orders")
             
-            if response.status_code == 200:
-                return response.json().get("orders", [])
+            if status == 200:
+                self._orders_cache = data.get("orders", [])
+                self._orders_cache_key = cache_key
+                return self._orders_cache
             return []
         except Exception as e:
             print(f"Get orders error: {e}")
             return []
     
-    def accept_order(self, order_id: str) -> bool:
+    async def accept_order(self, order_id: str) -> bool:
         """Accept an order"""
         if not self.auth_token:
             return False
         
         try:
-            headers = {"Authorization": f"Bearer {self.auth_token}"}
-            response = self.session.post(
-                f"{self.base_url}/driver/orders/{order_id}/accept",
-                headers=headers
-            )
-            return response.status_code == 200
+            status, _ = await self._request('POST', f"/driver/orders/{order_id}/accept")
+            if status == 200:
+                self._orders_cache_key = None
+                return True
+            return False
         except Exception as e:
             print(f"Accept order error: {e}")
             return False
     
-    def update_location(self, latitude: float, longitude: float) -> bool:
+    async def update_location(self, latitude: float, longitude: float) -> bool:
         """Update driver location"""
         if not self.auth_token:
             return False
         
         try:
-            headers = {"Authorization": f"Bearer {self.auth_token}"}
-            response = self.session.post(
-                f"{self.base_url}/driver/location",
-                json={"latitude": latitude, "longitude": longitude},
-                headers=headers
+            status, _ = await self._request(
+                'POST',
+                "/driver/location",
+                json={"latitude": latitude, "longitude": longitude}
             )
-            return response.status_code == 200
+            return status == 200
         except Exception as e:
             print(f"Update location error: {e}")
             return False
@@ -92,6 +132,19 @@ class TaxiDriverApp:
         self.api = TaxiDriverAPI()
         self.running = False
         self.current_order = None
+        
+        # One event loop for the whole run - the aiohttp session is bound to it
+        self.loop = asyncio.new_event_loop()
+        self.run = self.loop.run_until_complete
+        
+        # Menu choice -> handler
+        self._menu = {
+            "1": self.check_orders,
+            "2": self.update_location_manual,
+            "3": self.show_current_order,
+            "4": self.show_stats,
+            "5": self.stop,
+        }
     
     def start(self):
         """Start the application"""
@@ -103,12 +156,17 @@ class TaxiDriverApp:
         password = "demo123"
         
         print(f"Logging in as: {username}")
-        if self.api.login(username, password):
-            print("✅ Login successful!")
-            self.running = True
-            self.main_loop()
-        else:
-            print("❌ Login failed!")
+        try:
+            if self.run(self.api.login(username, password)):
+                print("✅ Login successful!")
+                self.running = True
+                self.main_loop()
+            else:
+                print("❌ Login failed!")
+        finally:
+            # Every exit path (login failure, menu exit, Ctrl+C) releases the session and loop
+            self.run(self.api.close())
+            self.loop.close()
     
     def main_loop(self):
         """Main application loop"""
@@ -116,20 +174,11 @@ class TaxiDriverApp:
             self.show_menu()
             choice = input("\nEnter choice (1-5): ").strip()
             
-            if choice == "1":
-                self.check_orders()
-            elif choice == "2":
-                self.update_location_manual()
-            elif choice == "3":
-                self.show_current_order()
-            elif choice == "4":
-                self.show_stats()
-            elif choice == "5":
-                self.stop()
+            handler = self._menu.get(choice)
+            if handler:
+                handler()
             else:
                 print("Invalid choice. Please try again.")
-            
-            time.sleep(1)
     
     def show_menu(self):
         """Display main menu"""
@@ -146,7 +195,7 @@ class TaxiDriverApp:
     def check_orders(self):
         """Check and display available orders"""
         print("\n📋 Checking available orders...")
-        orders = self.api.get_orders()
+        orders = self.run(self.api.get_orders())
         
         if not orders:
             print("No orders available at the moment.")
@@ -170,7 +219,7 @@ class TaxiDriverApp:
             
             if 1 <= order_num <= len(orders):
                 order = orders[order_num - 1]
-                if self.api.accept_order(order['id']):
+                if self.run(self.api.accept_order(order['id'])):
                     print(f"✅ Order #{order['id']} accepted!")
                     self.current_order = order
                 else:
@@ -187,7 +236,7 @@ class TaxiDriverApp:
             lat = float(input("Enter latitude: "))
             lng = float(input("Enter longitude: "))
             
-            if self.api.update_location(lat, lng):
+            if self.run(self.api.update_location(lat, lng)):
                 print("✅ Location updated successfully!")
             else:
                 print("❌ Failed to update location.")
@@ -33,7 +33,7 @@ version = 1.0.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy==2.1.0,kivymd==1.1.1,plyer,requests,keyring,cryptography,simplejson,pygame,certifi,pyjnius,python-dateutil,pillow,qrcode,websocket-client,pybase64,httpx,geopy,haversine,diskcache,configparser,psutil,kivy-garden.mapview
+requirements = python3,kivy==2.1.0,kivymd==1.1.1,plyer,requests,aiohttp,keyring,cryptography,simplejson,pygame,certifi,pyjnius,python-dateutil,pillow,qrcode,websocket-client,pybase64,httpx,geopy,haversine,diskcache,configparser,psutil,kivy-garden.mapview
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
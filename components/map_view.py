@@ -3,7 +3,14 @@ Map View Component for Taxi Driver App
 Handles GPS tracking, location display, and order visualization on map
 """
 
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from kivy.clock import Clock
+from kivy.core.image import Image as CoreImage
+from kivy.properties import NumericProperty
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.button import MDIconButton, MDRaisedButton
 from kivymd.uix.label import MDLabel
@@ -12,16 +19,44 @@ from kivy.metrics import dp
 from kivy.logger import Logger
 
 try:
-    from kivy_garden.mapview import MapView, MapMarker
+    from kivy_garden.mapview import MapView, MapMarker, MarkerMapLayer
     MAP_AVAILABLE = True
 except ImportError:
     Logger.warning("MapView: kivy-garden.mapview not available, using fallback")
     MAP_AVAILABLE = False
     MapView = None
     MapMarker = None
+    MarkerMapLayer = None
+
+
+# Ikony markerów - istnienie plików sprawdzane raz przy imporcie
+_MARKER_SOURCES = {
+    marker_type: path if os.path.exists(path) else None
+    for marker_type, path in {
+        "driver": "data/images/car_marker.png",
+        "pickup": "data/images/pickup_marker.png",
+        "destination": "data/images/destination_marker.png",
+        "order": "data/images/order_marker.png",
+    }.items()
+}
+
+# Tekstury markerów dzielone przez wszystkie markery danego typu (ładowane przy pierwszym użyciu)
+_MARKER_TEXTURES = {}
+
 
+def _marker_texture(path):
+    """Zdekoduj ikonę raz i zwróć wspólną teksturę"""
+    texture = _MARKER_TEXTURES.get(path)
+    if texture is None:
+        texture = _MARKER_TEXTURES[path] = CoreImage(path).texture
+    return texture
 
-class TaxiMapMarker(MapMarker if MAP_AVAILABLE else object):
+
+# Bez mapview markery są zwykłymi obiektami
+_MarkerBase = MapMarker if MAP_AVAILABLE else object
+
+
+class TaxiMapMarker(_MarkerBase):
     """Custom marker for taxi locations and orders"""
     
     def __init__(self, marker_type="driver", order_data=None, **kwargs):
@@ -34,36 +69,42 @@ class TaxiMapMarker(MapMarker if MAP_AVAILABLE else object):
         self.order_data = order_data
         
         # Set marker appearance based on type
-        if marker_type == "driver":
-            self.source = "data/images/car_marker.png" if self._image_exists("data/images/car_marker.png") else None
-        elif marker_type == "pickup":
-            self.source = "data/images/pickup_marker.png" if self._image_exists("data/images/pickup_marker.png") else None
-        elif marker_type == "destination":
-            self.source = "data/images/destination_marker.png" if self._image_exists("data/images/destination_marker.png") else None
-        elif marker_type == "order":
-            self.source = "data/images/order_marker.png" if self._image_exists("data/images/order_marker.png") else None
-    
-    def _image_exists(self, path):
-        try:
-            import os
-            return os.path.exists(path)
-        except:
-            return False
+        if marker_type in _MARKER_SOURCES:
+            path = _MARKER_SOURCES[marker_type]
+            if path is None:
+                self.source = None
+            else:
+                self.texture = _marker_texture(path)
 
 
-class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
+class MapViewComponent(MDBoxLayout):
     """Map view component with fallback when MapView is not available"""
     
+    # Last displayed position - the fallback label is bound to these
+    current_lat = NumericProperty(0.0)
+    current_lon = NumericProperty(0.0)
+    
     def __init__(self, location_service, api_service, **kwargs):
         super().__init__(**kwargs)
         self.orientation = "vertical"
         self.location_service = location_service
         self.api_service = api_service
+        # Single worker keeps network calls off the UI thread and in order
+        self._net_executor = ThreadPoolExecutor(max_workers=1)
+        self._refresh_in_flight = False
         
         self.current_location = None
+        self._last_sent_location = None
+        # Latest fix waiting for the debounce window to elapse
+        self._pending_location = None
+        self._drain_trigger = Clock.create_trigger(self._drain_location, 2.0)
         self.driver_marker = None
-        self.order_markers = []
-        self.active_order_markers = []
+        # Parsed orders: (order_id, order, (pickup_lat, pickup_lon), (dest_lat, dest_lon))
+        self._order_points = []
+        # (order_id, pickup, destination) -> markers of that order currently on the map
+        self.order_markers = {}
+        self._active_pickup_marker = None
+        self._active_dest_marker = None
         
         if MAP_AVAILABLE:
             self._create_map_view()
@@ -82,6 +123,14 @@ class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
             map_source="osm"
         )
         self.add_widget(self.map_view)
+        
+        # Dedicated layer for order markers - filled in batches by _add_markers
+        self._order_layer = MarkerMapLayer()
+        self.map_view.add_layer(self._order_layer)
+        
+        # Re-cull order markers after pan/zoom (coalesced while the map is moving)
+        self._cull_trigger = Clock.create_trigger(self._render_orders, 0.2)
+        self.map_view.bind(on_map_relocated=lambda *args: self._cull_trigger())
     
     def _create_fallback_view(self):
         """Create fallback view when MapView is not available"""
@@ -124,6 +173,10 @@ class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
             height=dp(30)
         )
         
+        # Reformat the label once per frame, only when the position actually changed
+        self._location_label_trigger = Clock.create_trigger(self._update_location_label)
+        self.bind(current_lat=self._location_label_trigger, current_lon=self._location_label_trigger)
+        
         fallback_layout.add_widget(title)
         fallback_layout.add_widget(self.location_label)
         fallback_layout.add_widget(self.orders_label)
@@ -131,6 +184,10 @@ class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
         fallback_card.add_widget(fallback_layout)
         self.add_widget(fallback_card)
     
+    def _update_location_label(self, dt):
+        """Refresh fallback location label"""
+        self.location_label.text = f"Location: {self.current_lat:.6f}, {self.current_lon:.6f}"
+    
     def _create_controls(self):
         """Create map control buttons"""
         controls_layout = MDBoxLayout(
@@ -173,121 +230,203 @@ class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
     def _bind_location_updates(self):
         """Bind to location service updates"""
         if self.location_service:
-            self.location_service.bind_location_listener(self.on_location_update)
+            self.location_service.add_location_listener(self._queue_location)
+    
+    def _queue_location(self, location):
+        """Keep only the latest fix; process at most one every 2 seconds"""
+        self._pending_location = location
+        self._drain_trigger()
+    
+    def _drain_location(self, dt):
+        """Process the latest queued fix"""
+        location = self._pending_location
+        self._pending_location = None
+        if location is not None:
+            self.on_location_update(location)
     
     def on_location_update(self, location):
         """Handle location updates"""
+        # Ignore GPS jitter below 10 m (equirectangular approximation)
+        last = self._last_sent_location
+        if last is not None:
+            dx = (location.latitude - last.latitude) * 111320
+            dy = (location.longitude - last.longitude) * 111320 * math.cos(math.radians(location.latitude))
+            if dx * dx + dy * dy < 100:
+                return
+        self._last_sent_location = location
+        
         self.current_location = location
         
         if MAP_AVAILABLE and hasattr(self, 'map_view'):
             # Update map center
-            self.map_view.center_on(location['lat'], location['lon'])
+            self._center_on(location.latitude, location.longitude)
             
-            # Update driver marker
-            if self.driver_marker:
-                self.map_view.remove_marker(self.driver_marker)
-            
-            self.driver_marker = TaxiMapMarker(
-                lat=location['lat'],
-                lon=location['lon'],
-                marker_type="driver"
-            )
-            self.map_view.add_marker(self.driver_marker)
+            # Update driver marker (created once, then moved in place)
+            if self.driver_marker is None:
+                self.driver_marker = TaxiMapMarker(
+                    lat=location.latitude,
+                    lon=location.longitude,
+                    marker_type="driver"
+                )
+                self.map_view.add_marker(self.driver_marker)
+            else:
+                self.driver_marker.lat = location.latitude
+                self.driver_marker.lon = location.longitude
+                self.map_view.trigger_update(False)
         else:
-            # Update fallback view
-            if hasattr(self, 'location_label'):
-                self.location_label.text = f"Location: {location['lat']:.6f}, {location['lon']:.6f}"
+            # Update fallback view (label follows the properties)
+            self.current_lat = location.latitude
+            self.current_lon = location.longitude
         
-        # Send location to server if online
-        self._send_location_update(location)
-    
-    def _send_location_update(self, location):
-        """Send location update to server"""
-        try:
-            if self.api_service and hasattr(self.api_service, 'driver_status') and self.api_service.driver_status.get('is_online'):
-                self.api_service.update_location(
-                    latitude=location['lat'],
-                    longitude=location['lon']
-                )
-        except Exception as e:
-            Logger.error(f"MapView: Failed to send location update: {e}")
+        # Uploading fixes is done by LocationService (batched, online/busy only)
     
     def center_on_location(self, *args):
         """Center map on current location"""
         if self.current_location:
             if MAP_AVAILABLE and hasattr(self, 'map_view'):
-                self.map_view.center_on(
-                    self.current_location['lat'],
-                    self.current_location['lon']
+                self._center_on(
+                    self.current_location.latitude,
+                    self.current_location.longitude
                 )
         else:
             self.location_service.get_current_location()
     
+    def _center_on(self, lat, lon):
+        """Center the map unless it is already centered there (avoids redraw and tile fetch)"""
+        if abs(self.map_view.lat - lat) > 1e-6 or abs(self.map_view.lon - lon) > 1e-6:
+            self.map_view.center_on(lat, lon)
+    
     def refresh_orders(self, *args):
-        """Refresh nearby orders"""
+        """Refresh nearby orders (fetched on the worker, drawn on the UI thread)"""
+        # Repeated taps while a request is pending share that request
+        if not self.api_service or self._refresh_in_flight:
+            return
+        self._refresh_in_flight = True
+        self._net_executor.submit(self._fetch_orders)
+    
+    def _fetch_orders(self):
+        """Get orders from pool (worker thread)"""
         try:
-            # Clear existing order markers
-            if MAP_AVAILABLE and hasattr(self, 'map_view'):
-                for marker in self.order_markers:
-                    self.map_view.remove_marker(marker)
-            self.order_markers.clear()
+            orders = self.api_service.check_pool()
+        except Exception as e:
+            Logger.error(f"MapView: Failed to refresh orders: {e}")
+            orders = None
+        Clock.schedule_once(partial(self._on_orders_fetched, orders))
+    
+    def _on_orders_fetched(self, orders, dt):
+        """Display fetched orders (UI thread)"""
+        self._refresh_in_flight = False
+        if orders is None:
+            return
+        
+        try:
+            self.display_orders(orders)
             
-            # Get orders from pool
-            if self.api_service:
-                orders = self.api_service.check_pool()
-                self.display_orders(orders)
-                
-                if not MAP_AVAILABLE and hasattr(self, 'orders_label'):
-                    self.orders_label.text = f"Orders: {len(orders)} nearby orders found"
+            if not MAP_AVAILABLE and hasattr(self, 'orders_label'):
+                self.orders_label.text = f"Orders: {len(orders)} nearby orders found"
         except Exception as e:
             Logger.error(f"MapView: Failed to refresh orders: {e}")
     
     def display_orders(self, orders):
         """Display orders on map"""
+        # Parse coordinates once; pans re-render from the parsed tuples
+        order_points = []
+        invalid = 0
+        for order in orders:
+            try:
+                coords = (
+                    float(order.get('pickup_latitude', 0)),
+                    float(order.get('pickup_longitude', 0)),
+                    float(order.get('destination_latitude', 0)),
+                    float(order.get('destination_longitude', 0)),
+                )
+            except (ValueError, TypeError):
+                invalid += 1
+                continue
+            # float() accepts "nan"/"inf" - such rows are skipped too
+            if not all(map(math.isfinite, coords)):
+                invalid += 1
+                continue
+            order_points.append((order.get('id', id(order)), order, coords[:2], coords[2:]))
+        
+        # One warning per refresh instead of one per bad order
+        if invalid:
+            Logger.warning(f"MapView: Skipped {invalid} orders with invalid coordinates")
+        
+        self._order_points = order_points
+        self._render_orders()
+    
+    def _viewport_bounds(self):
+        """Visible map area (min_lat, min_lon, max_lat, max_lon) with a 10% margin"""
+        min_lat, min_lon, max_lat, max_lon = self.map_view.get_bbox()
+        margin_lat = (max_lat - min_lat) * 0.1
+        margin_lon = (max_lon - min_lon) * 0.1
+        return (min_lat - margin_lat, min_lon - margin_lon, max_lat + margin_lat, max_lon + margin_lon)
+    
+    def _render_orders(self, *args):
+        """Create markers only for orders inside the visible map area"""
         if not MAP_AVAILABLE:
             return
             
         if not hasattr(self, 'map_view'):
             return
         
-        for order in orders:
-            try:
-                pickup_lat = float(order.get('pickup_latitude', 0))
-                pickup_lon = float(order.get('pickup_longitude', 0))
-                dest_lat = float(order.get('destination_latitude', 0))
-                dest_lon = float(order.get('destination_longitude', 0))
-                
-                if pickup_lat and pickup_lon:
-                    pickup_marker = TaxiMapMarker(
-                        lat=pickup_lat,
-                        lon=pickup_lon,
-                        marker_type="pickup",
-                        order_data=order
-                    )
-                    self.map_view.add_marker(pickup_marker)
-                    self.order_markers.append(pickup_marker)
-                
-                if dest_lat and dest_lon:
-                    dest_marker = TaxiMapMarker(
-                        lat=dest_lat,
-                        lon=dest_lon,
-                        marker_type="destination",
+        min_lat, min_lon, max_lat, max_lon = self._viewport_bounds()
+        
+        # Visible orders keyed by id and coordinates, so a moved order gets new markers:
+        # (order_id, pickup, destination) -> order
+        visible = {}
+        for order_id, order, pickup, destination in self._order_points:
+            # Skip orders with both ends off screen
+            if not (min_lat <= pickup[0] <= max_lat and min_lon <= pickup[1] <= max_lon) and \
+                    not (min_lat <= destination[0] <= max_lat and min_lon <= destination[1] <= max_lon):
+                continue
+            
+            visible[(order_id, pickup, destination)] = order
+        
+        # Remove markers of orders that are gone, moved or went off screen
+        for key in self.order_markers.keys() - visible.keys():
+            for marker in self.order_markers.pop(key):
+                self.map_view.remove_marker(marker)
+        
+        # Create markers only for orders that just became visible (or moved)
+        new_markers = []
+        for key, order in visible.items():
+            if key in self.order_markers:
+                continue
+            
+            _, pickup, destination = key
+            markers = []
+            for (lat, lon), marker_type in ((pickup, "pickup"), (destination, "destination")):
+                if lat and lon:
+                    markers.append(TaxiMapMarker(
+                        lat=lat,
+                        lon=lon,
+                        marker_type=marker_type,
                         order_data=order
-                    )
-                    self.map_view.add_marker(dest_marker)
-                    self.order_markers.append(dest_marker)
-            except (ValueError, TypeError) as e:
-                Logger.warning(f"MapView: Invalid coordinates in order: {e}")
+                    ))
+            self.order_markers[key] = markers
+            new_markers.extend(markers)
+        
+        self._add_markers(new_markers)
+    
+    def _add_markers(self, markers):
+        """Add several markers with a single map redraw"""
+        if not markers:
+            return
+        
+        # Positions are set for all markers at once by the layer on the next update
+        layer = self._order_layer
+        for marker in markers:
+            layer.add_widget(marker)
+        self.map_view.trigger_update(False)
     
     def display_active_order(self, order):
         """Display active order route on map"""
-        # Clear previous active order markers
-        if MAP_AVAILABLE and hasattr(self, 'map_view'):
-            for marker in self.active_order_markers:
-                self.map_view.remove_marker(marker)
-        self.active_order_markers.clear()
-        
         if not order:
+            # Clear previous active order markers
+            self._active_pickup_marker = self._place_active_marker(self._active_pickup_marker, 0, 0, "pickup", None)
+            self._active_dest_marker = self._place_active_marker(self._active_dest_marker, 0, 0, "destination", None)
             return
         
         if not MAP_AVAILABLE:
@@ -304,64 +443,72 @@ class MapViewComponent(MDBoxLayout if not MAP_AVAILABLE else MDBoxLayout):
             dest_lat = float(order.get('destination_latitude', 0))
             dest_lon = float(order.get('destination_longitude', 0))
             
-            if pickup_lat and pickup_lon:
-                pickup_marker = TaxiMapMarker(
-                    lat=pickup_lat,
-                    lon=pickup_lon,
-                    marker_type="pickup",
-                    order_data=order
-                )
-                self.map_view.add_marker(pickup_marker)
-                self.active_order_markers.append(pickup_marker)
-            
-            if dest_lat and dest_lon:
-                dest_marker = TaxiMapMarker(
-                    lat=dest_lat,
-                    lon=dest_lon,
-                    marker_type="destination",
-                    order_data=order
-                )
-                self.map_view.add_marker(dest_marker)
-                self.active_order_markers.append(dest_marker)
+            # Reuse the existing markers - only moved endpoints change
+            self._active_pickup_marker = self._place_active_marker(
+                self._active_pickup_marker, pickup_lat, pickup_lon, "pickup", order
+            )
+            self._active_dest_marker = self._place_active_marker(
+                self._active_dest_marker, dest_lat, dest_lon, "destination", order
+            )
             
             # Center map to show both points
             if pickup_lat and pickup_lon and dest_lat and dest_lon:
                 center_lat = (pickup_lat + dest_lat) / 2
                 center_lon = (pickup_lon + dest_lon) / 2
-                self.map_view.center_on(center_lat, center_lon)
+                self._center_on(center_lat, center_lon)
         except (ValueError, TypeError) as e:
             Logger.warning(f"MapView: Invalid coordinates in active order: {e}")
     
+    def _place_active_marker(self, marker, lat, lon, marker_type, order):
+        """Create, move or remove an active order marker; returns the marker now on the map"""
+        if not MAP_AVAILABLE or not hasattr(self, 'map_view'):
+            return None
+        
+        if not (lat and lon):
+            if marker is not None:
+                self.map_view.remove_marker(marker)
+            return None
+        
+        if marker is None:
+            marker = TaxiMapMarker(lat=lat, lon=lon, marker_type=marker_type, order_data=order)
+            self.map_view.add_marker(marker)
+            return marker
+        
+        marker.order_data = order
+        if marker.lat != lat or marker.lon != lon:
+            marker.lat = lat
+            marker.lon = lon
+            self.map_view.trigger_update(False)
+        return marker
+    
     def toggle_driver_status(self, *args):
         """Toggle driver online/offline status"""
         try:
-            if self.api_service:
-                current_status = self.api_service.driver_status.get('is_online', False)
-                new_status = not current_status
+            if self.location_service:
+                new_status = self.location_service.driver_status == 'offline'
                 
-                # Update status on server
-                self.api_service.update_driver_status(is_online=new_status)
+                # Status goes to the server together with the buffered fixes
+                self.location_service.update_driver_status('online' if new_status else 'offline')
                 
                 # Update button text
+                self._apply_status_visual(new_status)
                 if new_status:
-                    self.status_button.text = "Go Offline"
-                    self.status_button.md_bg_color = (0.8, 0.2, 0.2, 1)
-                    if self.location_service:
-                        self.location_service.start_tracking()
+                    self.location_service.safe_start_location_updates()
                 else:
-                    self.status_button.text = "Go Online"
-                    self.status_button.md_bg_color = (0.2, 0.7, 0.2, 1)
-                    if self.location_service:
-                        self.location_service.stop_tracking()
+                    self.location_service.stop_location_updates()
         except Exception as e:
             Logger.error(f"MapView: Failed to toggle driver status: {e}")
     
     def update_driver_status(self, status):
         """Update driver status from external source"""
-        is_online = status.get('is_online', False)
+        self._apply_status_visual(status.get('is_online', False))
+    
+    def _apply_status_visual(self, is_online):
+        """Set status button text/color; no-op when it already shows this status"""
         if is_online:
-            self.status_button.text = "Go Offline"
-            self.status_button.md_bg_color = (0.8, 0.2, 0.2, 1)
+            text, color = "Go Offline", (0.8, 0.2, 0.2, 1)
         else:
-            self.status_button.text = "Go Online"
-            self.status_button.md_bg_color = (0.2, 0.7, 0.2, 1)
+            text, color = "Go Online", (0.2, 0.7, 0.2, 1)
+        if self.status_button.text != text:
+            self.status_button.text = text
+            self.status_button.md_bg_color = color
@@ -6,9 +6,18 @@ Zachowuje 100% kompatybilności z API
 Dodany lepszy error handling żeby się nie wykładała
 """
 
+import importlib
 import os
+from functools import partial
 import sys
-import traceback
+
+# Pełne tracebacki tylko w trybie debug (TAXIDRIVER_DEBUG=1)
+_DEBUG = os.environ.get('TAXIDRIVER_DEBUG') == '1'
+
+# Limit klatek ustawiany przed utworzeniem okna - bez niego zegar Kivy kręci się bez ograniczeń
+from kivy.config import Config
+Config.set('graphics', 'maxfps', '30')
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
@@ -24,67 +33,43 @@ from kivy.logger import Logger
 
 from kivymd.app import MDApp
 from kivymd.uix.screen import MDScreen
-from kivymd.uix.button import MDRaisedButton, MDIconButton, MDFabButton
-from kivymd.uix.textfield import MDTextField
-from kivymd.uix.label import MDLabel
-from kivymd.uix.card import MDCard
-from kivymd.uix.list import MDList, OneLineListItem
-from kivymd.uix.bottomnavigation import MDBottomNavigation, MDBottomNavigationItem
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.spinner import MDSpinner
-from kivymd.uix.toolbar import MDTopAppBar
 
 import asyncio
-import threading
 
-# Safe imports with error handling
-try:
-    from services.api_service import APIService
-except ImportError as e:
-    Logger.error(f"Failed to import APIService: {e}")
-    APIService = None
+# Serwisy i ekrany importowane dopiero przy pierwszym użyciu (PEP 562)
+_LAZY_IMPORTS = {
+    'APIService': 'services.api_service',
+    'LocationService': 'services.location_service',
+    'SoundService': 'services.sound_service',
+    'LoginScreen': 'screens.login_screen',
+    'HomeScreen': 'screens.home_screen',
+    'ProfileScreen': 'screens.profile_screen',
+    'OrderStorageScreen': 'screens.order_storage_screen',
+    'MessagesScreen': 'screens.messages_screen',
+}
 
-try:
-    from services.location_service import LocationService
-except ImportError as e:
-    Logger.error(f"Failed to import LocationService: {e}")
-    LocationService = None
 
-try:
-    from services.sound_service import SoundService
-except ImportError as e:
-    Logger.error(f"Failed to import SoundService: {e}")
-    SoundService = None
-
-try:
-    from screens.login_screen import LoginScreen
-except ImportError as e:
-    Logger.error(f"Failed to import LoginScreen: {e}")
-    LoginScreen = None
+def _resolve(name):
+    """Zaimportuj klasę przy pierwszym użyciu; None gdy niedostępna"""
+    if name in globals():
+        return globals()[name]
+    try:
+        obj = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    except (ImportError, AttributeError) as e:
+        Logger.error(f"Failed to import {name}: {e}")
+        obj = None
+    globals()[name] = obj
+    return obj
 
-try:
-    from screens.home_screen import HomeScreen
-except ImportError as e:
-    Logger.error(f"Failed to import HomeScreen: {e}")
-    HomeScreen = None
 
-try:
-    from screens.profile_screen import ProfileScreen
-except ImportError as e:
-    Logger.error(f"Failed to import ProfileScreen: {e}")
-    ProfileScreen = None
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return _resolve(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-try:
-    from screens.order_storage_screen import OrderStorageScreen
-except ImportError as e:
-    Logger.error(f"Failed to import OrderStorageScreen: {e}")
-    OrderStorageScreen = None
 
-try:
-    from screens.messages_screen import MessagesScreen
-except ImportError as e:
-    Logger.error(f"Failed to import MessagesScreen: {e}")
-    MessagesScreen = None
+# Wymiary ekranu błędu - przeliczane na piksele raz przy imporcie
+_DP10, _DP20, _DP40, _DP50, _DP100, _DP120, _DP210, _DP300, _DP320 = (dp(v) for v in (10, 20, 40, 50, 100, 120, 210, 300, 320))
 
 
 class ErrorScreen(MDScreen):
@@ -92,23 +77,30 @@ class ErrorScreen(MDScreen):
     
     def __init__(self, error_message="An error occurred", **kwargs):
         super().__init__(**kwargs)
+        # Widgety KivyMD ładowane dopiero, gdy ekran błędu jest potrzebny
+        from kivymd.uix.button import MDRaisedButton
+        from kivymd.uix.card import MDCard
+        from kivymd.uix.label import MDLabel
         
         layout = BoxLayout(
             orientation='vertical',
-            padding=dp(20),
-            spacing=dp(20)
+            padding=_DP20,
+            spacing=_DP20
         )
         
         error_card = MDCard(
-            size_hint=(1, None),
-            height=dp(300),
-            padding=dp(20),
+            size_hint=(None, None),
+            size=(_DP320, _DP300),
+            pos_hint={'center_x': 0.5, 'center_y': 0.5},
+            padding=_DP20,
             md_bg_color=(1, 0.95, 0.95, 1)
         )
         
         error_layout = BoxLayout(
             orientation='vertical',
-            spacing=dp(10)
+            spacing=_DP10,
+            size_hint_y=None,
+            height=_DP210
         )
         
         title = MDLabel(
@@ -116,27 +108,27 @@ class ErrorScreen(MDScreen):
             font_style="H5",
             halign="center",
             size_hint_y=None,
-            height=dp(50)
+            height=_DP50
         )
         
-        message = MDLabel(
+        self.message_label = MDLabel(
             text=error_message,
             halign="center",
             text_color=(0.8, 0, 0, 1),
             size_hint_y=None,
-            height=dp(100)
+            height=_DP100
         )
         
         retry_button = MDRaisedButton(
             text="Retry",
             size_hint=(None, None),
-            size=(dp(120), dp(40)),
+            size=(_DP120, _DP40),
             pos_hint={'center_x': 0.5},
             on_release=self.retry
         )
         
         error_layout.add_widget(title)
-        error_layout.add_widget(message)
+        error_layout.add_widget(self.message_label)
         error_layout.add_widget(retry_button)
         
         error_card.add_widget(error_layout)
@@ -144,6 +136,10 @@ class ErrorScreen(MDScreen):
         
         self.add_widget(layout)
     
+    def set_message(self, error_message):
+        """Show a new error message on the existing screen"""
+        self.message_label.text = error_message
+    
     def retry(self, *args):
         """Retry the application"""
         try:
@@ -175,9 +171,22 @@ class TaxiDriverApp(MDApp):
         self.driver_data = None
         self.current_orders = []
         self.order_pool = []
+        self._order_pool_ids = frozenset()
+        self._last_orders_key = None
         self.error_count = 0
         self.max_errors = 5
         
+        # Screens - created in add_screens
+        self.login_screen = None
+        self.home_screen = None
+        
+        # Ekran błędu tworzony raz i używany ponownie
+        self._error_root = None
+        
+        self._update_ui_trigger = Clock.create_trigger(self._safe_update_ui, 0)
+        # Cykliczne pobieranie zleceń - jedno zdarzenie na sesję
+        self._orders_event = None
+        
     def build(self):
         """Builds the application interface with error handling"""
         try:
@@ -187,12 +196,17 @@ class TaxiDriverApp(MDApp):
             self.screen_manager = ScreenManager()
             
             # Initialize services safely
-            if not self.init_services():
-                return self.create_error_screen("Failed to initialize services")
+            services_ok = self.init_services()
             
-            # Add screens safely
+            # Add screens safely - without any screen only the error screen is left
             if not self.add_screens():
-                return self.create_error_screen("Failed to add screens")
+                return self.create_error_screen(
+                    "Failed to add screens" if services_ok else "Failed to initialize services"
+                )
+            
+            # Service failure is often transient - keep the UI and just inform the user
+            if not services_ok:
+                Clock.schedule_once(partial(self._show_error_dialog, "Failed to initialize services"), 0)
             
             # Schedule auto-login check
             Clock.schedule_once(self.safe_check_credentials, 1)
@@ -202,14 +216,40 @@ class TaxiDriverApp(MDApp):
             
         except Exception as e:
             Logger.error(f"Critical error building app: {e}")
-            traceback.print_exc()
+            if _DEBUG:
+                import traceback
+                traceback.print_exc()
             return self.create_error_screen(f"Critical error: {str(e)}")
     
+    async def main_async(self):
+        """Uruchom aplikację na pętli asyncio - UI i zapytania API dzielą jedną pętlę"""
+        try:
+            await self.async_run(async_lib='asyncio')
+        finally:
+            if self.api_service:
+                await self.api_service.close()
+    
+    def _run_async(self, coro):
+        """Zleć korutynę pętli aplikacji (bez wątków)"""
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(self._on_task_done)
+        return task
+    
+    @staticmethod
+    def _on_task_done(task):
+        """Zaloguj błąd zadania w tle - bez czekania na wynik"""
+        if not task.cancelled() and task.exception() is not None:
+            Logger.error(f"Background task failed: {task.exception()}")
+    
     def init_services(self):
         """Initialize services with error handling"""
         try:
             Logger.info("Initializing services...")
             
+            APIService = _resolve('APIService')
+            LocationService = _resolve('LocationService')
+            SoundService = _resolve('SoundService')
+            
             # API Service
             if APIService:
                 self.api_service = APIService()
@@ -220,7 +260,10 @@ class TaxiDriverApp(MDApp):
             
             # Location Service
             if LocationService:
-                self.location_service = LocationService()
+                self.location_service = LocationService(
+                    api_service=self.api_service,
+                    cache_path=os.path.join(self.user_data_dir, 'last_location.json')
+                )
                 Logger.info("Location service initialized")
             else:
                 Logger.warning("LocationService not available")
@@ -236,13 +279,17 @@ class TaxiDriverApp(MDApp):
             
         except Exception as e:
             Logger.error(f"Failed to initialize services: {e}")
-            traceback.print_exc()
+            if _DEBUG:
+                import traceback
+                traceback.print_exc()
             return False
     
     def add_screens(self):
         """Add screens with error handling"""
         try:
             Logger.info("Adding screens...")
+            LoginScreen = _resolve('LoginScreen')
+            HomeScreen = _resolve('HomeScreen')
             
             # Login screen
             if LoginScreen:
@@ -283,15 +330,22 @@ class TaxiDriverApp(MDApp):
             
         except Exception as e:
             Logger.error(f"Failed to add screens: {e}")
-            traceback.print_exc()
+            if _DEBUG:
+                import traceback
+                traceback.print_exc()
             return False
     
     def create_error_screen(self, message):
         """Create an error screen"""
         try:
+            if self._error_root is not None:
+                self._error_root.get_screen('error').set_message(message)
+                return self._error_root
+            
             error_screen = ErrorScreen(error_message=message, name='error')
             screen_manager = ScreenManager()
             screen_manager.add_widget(error_screen)
+            self._error_root = screen_manager
             return screen_manager
         except Exception as e:
             Logger.error(f"Failed to create error screen: {e}")
@@ -299,6 +353,14 @@ class TaxiDriverApp(MDApp):
             from kivy.uix.label import Label
             return Label(text=f"Critical Error: {message}")
     
+    def _show_error_dialog(self, message, dt=None):
+        """Show a non-fatal error on top of the current screen"""
+        try:
+            from kivymd.uix.dialog import MDDialog
+            MDDialog(title="Error", text=message).open()
+        except Exception as e:
+            Logger.error(f"Failed to show error dialog: {e}")
+    
     def safe_check_credentials(self, dt):
         """Safely check saved credentials"""
         try:
@@ -306,26 +368,21 @@ class TaxiDriverApp(MDApp):
                 Logger.warning("Cannot check credentials - API service not available")
                 return
             
-            threading.Thread(
-                target=self._check_credentials_async,
-                daemon=True
-            ).start()
+            self._run_async(self._check_credentials_async())
         except Exception as e:
             Logger.error(f"Error scheduling credential check: {e}")
     
-    def _check_credentials_async(self):
-        """Check credentials in background thread"""
+    async def _check_credentials_async(self):
+        """Check credentials on the background loop"""
         try:
             if not self.api_service:
                 return
             
             # Try auto-login
-            result = asyncio.run(self.api_service.auto_login())
+            result = await self.api_service.auto_login()
             
             if result.get('success'):
-                Clock.schedule_once(
-                    lambda dt: self.safe_login_success(result.get('data')), 0
-                )
+                Clock.schedule_once(partial(self.safe_login_success, result.get('data')), 0)
             else:
                 Logger.info("No saved credentials found")
                 
@@ -335,7 +392,7 @@ class TaxiDriverApp(MDApp):
             if self.error_count >= self.max_errors:
                 Logger.error("Too many errors, stopping credential checks")
     
-    def safe_login_success(self, driver_data):
+    def safe_login_success(self, driver_data, dt=None):
         """Safely handle login success"""
         try:
             self.on_login_success(driver_data)
@@ -351,18 +408,20 @@ class TaxiDriverApp(MDApp):
             self.error_count = 0  # Reset error count
             
             # Switch to home screen if available
-            if hasattr(self, 'home_screen'):
+            if self.home_screen is not None:
                 self.screen_manager.current = 'home'
             
-            # Start location tracking if available
+            # Start location tracking if available (zalogowany kierowca jest online)
             if self.location_service:
                 try:
-                    self.location_service.start_tracking()
+                    self.location_service.set_driver_status('online')
+                    self.location_service.safe_start_location_updates()
                 except Exception as e:
                     Logger.error(f"Failed to start location tracking: {e}")
             
-            # Start order monitoring
-            Clock.schedule_interval(self.safe_update_orders, 10)
+            # Start order monitoring (once, even if login fires twice)
+            if self._orders_event is None:
+                self._orders_event = Clock.schedule_interval(self.safe_update_orders, 10)
             
         except Exception as e:
             Logger.error(f"Error in login success handler: {e}")
@@ -373,24 +432,27 @@ class TaxiDriverApp(MDApp):
             Logger.info("Logging out")
             self.is_logged_in = False
             self.driver_data = None
-            self.current_orders = []
-            self.order_pool = []
+            self.current_orders.clear()
+            self.order_pool.clear()
+            self._order_pool_ids = frozenset()
+            self._last_orders_key = None
             
             # Stop services
             if self.location_service:
                 try:
-                    self.location_service.stop_tracking()
+                    # Najpierw offline - nowe odczyty nie trafiają już do bufora
+                    self.location_service.set_driver_status('offline')
+                    self.location_service.stop_location_updates()
                 except Exception as e:
                     Logger.error(f"Error stopping location service: {e}")
             
-            Clock.unschedule(self.safe_update_orders)
+            if self._orders_event is not None:
+                self._orders_event.cancel()
+                self._orders_event = None
             
             # Logout from API
             if self.api_service:
-                threading.Thread(
-                    target=lambda: self.safe_api_logout(),
-                    daemon=True
-                ).start()
+                self._run_async(self.safe_api_logout())
             
             # Return to login screen
             self.screen_manager.current = 'login'
@@ -398,11 +460,11 @@ class TaxiDriverApp(MDApp):
         except Exception as e:
             Logger.error(f"Error during logout: {e}")
     
-    def safe_api_logout(self):
+    async def safe_api_logout(self):
         """Safely logout from API"""
         try:
             if self.api_service:
-                asyncio.run(self.api_service.logout())
+                await self.api_service.logout()
         except Exception as e:
             Logger.error(f"Error logging out from API: {e}")
     
@@ -412,47 +474,58 @@ class TaxiDriverApp(MDApp):
             if not self.is_logged_in or not self.api_service:
                 return
             
-            threading.Thread(
-                target=self._update_orders_async,
-                daemon=True
-            ).start()
+            self._run_async(self._update_orders_async())
         except Exception as e:
             Logger.error(f"Error scheduling order update: {e}")
     
-    def _update_orders_async(self):
-        """Update orders in background"""
+    async def _update_orders_async(self):
+        """Update orders (task on the app event loop)"""
         try:
             if not self.api_service:
                 return
             
+            # Current orders and order pool are independent - fetch both at once
+            current_result, pool_result = await asyncio.gather(
+                self.api_service.get_current_orders(),
+                self.api_service.check_order_pool(),
+                return_exceptions=True
+            )
+            
             # Get current orders
-            try:
-                current_result = asyncio.run(self.api_service.get_current_orders())
-                if current_result.get('success'):
-                    self.current_orders = current_result.get('data', [])
-            except Exception as e:
-                Logger.error(f"Error getting current orders: {e}")
+            if isinstance(current_result, Exception):
+                Logger.error(f"Error getting current orders: {current_result}")
+            else:
+                success, data = current_result.get('success'), current_result.get('data') or []
+                if success:
+                    self.current_orders[:] = data
             
             # Get order pool
-            try:
-                pool_result = asyncio.run(self.api_service.check_order_pool())
-                if pool_result.get('success'):
-                    new_orders = pool_result.get('data', [])
+            if isinstance(pool_result, Exception):
+                Logger.error(f"Error getting order pool: {pool_result}")
+            else:
+                success, new_orders = pool_result.get('success'), pool_result.get('data') or []
+                if success:
+                    new_ids = frozenset(order.get('id') for order in new_orders)
                     
-                    # Check for new orders
-                    if len(new_orders) > len(self.order_pool):
+                    # Check for new orders (by id - a replaced order also counts)
+                    if new_ids - self._order_pool_ids:
                         if self.sound_service:
                             try:
                                 self.sound_service.play_new_order_sound()
                             except Exception as e:
                                 Logger.error(f"Error playing sound: {e}")
                     
-                    self.order_pool = new_orders
-            except Exception as e:
-                Logger.error(f"Error getting order pool: {e}")
-            
-            # Update UI
-            Clock.schedule_once(self._safe_update_ui, 0)
+                    self.order_pool[:] = new_orders
+                    self._order_pool_ids = new_ids
+            
+            # Update UI only when orders changed since the last poll
+            orders_key = (
+                tuple((order.get('id'), order.get('status')) for order in self.current_orders),
+                self._order_pool_ids
+            )
+            if orders_key != self._last_orders_key:
+                self._last_orders_key = orders_key
+                self._update_ui_trigger()
             
         except Exception as e:
             Logger.error(f"Error updating orders: {e}")
@@ -461,11 +534,22 @@ class TaxiDriverApp(MDApp):
     def _safe_update_ui(self, dt):
         """Safely update UI with orders"""
         try:
-            if hasattr(self.home_screen, 'update_orders'):
+            if self.home_screen is not None and hasattr(self.home_screen, 'update_orders'):
                 self.home_screen.update_orders(self.current_orders, self.order_pool)
         except Exception as e:
             Logger.error(f"Error updating UI: {e}")
     
+    def on_pause(self):
+        """Aplikacja w tle - rzadsze odczyty GPS"""
+        if self.location_service:
+            self.location_service.on_app_pause()
+        return True
+    
+    def on_resume(self):
+        """Powrót na pierwszy plan - pełna częstotliwość GPS"""
+        if self.location_service:
+            self.location_service.on_app_resume()
+    
     def restart(self):
         """Restart the application"""
         try:
@@ -476,15 +560,30 @@ class TaxiDriverApp(MDApp):
             Logger.error(f"Error restarting app: {e}")
 
 
+def _install_uvloop():
+    """Use uvloop's event loop when available (optional dependency)"""
+    if sys.platform == 'win32':
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+    Logger.info("Using uvloop event loop")
+
+
 def safe_main():
     """Safely run the main application"""
     try:
         Logger.info("Starting TaxiDriver app")
+        _install_uvloop()
         app = TaxiDriverApp()
-        app.run()
+        asyncio.run(app.main_async())
     except Exception as e:
         Logger.error(f"Critical error running app: {e}")
-        traceback.print_exc()
+        if _DEBUG:
+            import traceback
+            traceback.print_exc()
         
         # Try to show a basic error message
         try:
@@ -196,7 +196,7 @@ class MapScreen(Screen):
                 location = self.location_service.get_last_known_location()
                 if location:
                     print(f"Używam zapisanej lokalizacji: {location}")
-                    self.map_view.update_region(location['latitude'], location['longitude'])
+                    self.map_view.update_region(location.latitude, location.longitude)
                 else:
                     print("Pobieranie aktualnej lokalizacji...")
                     # Tu będzie pobieranie lokalizacji z GPS
@@ -206,18 +206,8 @@ class MapScreen(Screen):
     def handle_location_change(self, location):
         """Obsłuż zmianę lokalizacji"""
         if location:
-            self.map_view.update_region(location['latitude'], location['longitude'])
-            
-            # Wyślij aktualizację lokalizacji jeśli kierowca jest online
-            if self.driver_status in ['online', 'busy']:
-                asyncio.create_task(self.update_location(location['latitude'], location['longitude']))
-    
-    async def update_location(self, latitude, longitude):
-        """Aktualizuj lokalizację przez API"""
-        try:
-            await self.api_service.update_location(latitude, longitude)
-        except Exception as error:
-            print(f"Błąd podczas aktualizacji lokalizacji: {error}")
+            self.map_view.update_region(location.latitude, location.longitude)
+            # Wysyłkę lokalizacji do API robi LocationService (paczkami)
     
     def check_order_pool_sync(self, dt):
         """Synchroniczna wrapper dla sprawdzania puli zleceń"""
@@ -275,7 +265,7 @@ class MapScreen(Screen):
                         # Odtwórz dźwięk powiadomienia
                         if self.sound_service:
                             try:
-                                await self.sound_service.play_new_order_sound()
+                                self.sound_service.play_new_order_sound()
                             except Exception as e:
                                 print(f"Nie udało się odtworzyć dźwięku: {e}")
                         
@@ -345,7 +335,7 @@ class MapScreen(Screen):
                 if len(new_orders) > len(self.current_orders):
                     if self.sound_service:
                         try:
-                            await self.sound_service.play_new_order_sound()
+                            self.sound_service.play_new_order_sound()
                         except Exception as e:
                             print(f"Nie udało się odtworzyć dźwięku: {e}")
                     
@@ -362,10 +352,12 @@ class MapScreen(Screen):
     async def fetch_driver_status(self):
         """Pobierz status kierowcy"""
         try:
-            response = await self.api_service.check_driver_status()
-            if response.get('success'):
-                # Status będzie ustalony przez API lub lokalnie
+            # API nie ma endpointu statusu - zalogowany kierowca jest online
+            if self.api_service.is_logged_in:
                 self.driver_status = 'online'  # Domyślnie online po zalogowaniu
+                if self.location_service:
+                    # Wysyłka lokalizacji tylko online/busy
+                    self.location_service.set_driver_status(self.driver_status)
                 self.update_status_bar()
         except Exception as error:
             print(f"Błąd podczas pobierania statusu kierowcy: {error}")
@@ -536,13 +528,10 @@ class SafeHomeScreen(Screen):
             # Update map safely
             if hasattr(self.map_component, 'update_region'):
                 self.map_component.update_region(
-                    location['latitude'], 
-                    location['longitude']
+                    location.latitude, 
+                    location.longitude
                 )
-                
-            # Update API safely
-            if self.api_service:
-                self.safe_update_driver_location(location)
+            # Wysyłkę lokalizacji do API robi LocationService (paczkami)
                 
         except Exception as e:
             Logger.error(f"Location update error: {e}")
@@ -551,15 +540,8 @@ class SafeHomeScreen(Screen):
     def validate_location(self, location) -> bool:
         """Validate location data"""
         try:
-            if not isinstance(location, dict):
-                return False
-                
-            required_fields = ['latitude', 'longitude']
-            for field in required_fields:
-                if field not in location:
-                    return False
-                    
-                value = location[field]
+            for field in ('latitude', 'longitude'):
+                value = getattr(location, field, None)
                 if not isinstance(value, (int, float)):
                     return False
                     
@@ -569,32 +551,6 @@ class SafeHomeScreen(Screen):
             Logger.error(f"Location validation error: {e}")
             return False
 
-    def safe_update_driver_location(self, location):
-        """Safely update driver location via API"""
-        try:
-            # Run in background thread
-            threading.Thread(
-                target=self._update_location_async,
-                args=(location,),
-                daemon=True
-            ).start()
-            
-        except Exception as e:
-            Logger.error(f"Error starting location update: {e}")
-
-    def _update_location_async(self, location):
-        """Update location in background"""
-        try:
-            result = asyncio.run(
-                self.api_service.update_location(location)
-            )
-            
-            if not result.get('success'):
-                Logger.warning("Location update API call failed")
-                
-        except Exception as e:
-            Logger.error(f"Async location update error: {e}")
-
     def schedule_safe_updates(self):
         """Schedule periodic updates with error handling"""
         try:
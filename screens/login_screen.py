@@ -16,8 +16,20 @@ from kivymd.uix.progressbar import MDProgressBar
 from kivymd.uix.relativelayout import MDRelativeLayout
 import asyncio
 import threading
-import keyring
 import re
+from functools import partial
+
+
+# Znaki usuwane z numeru telefonu przed sprawdzeniem długości
+_PHONE_CLEAN_RE = re.compile(r'[^\d+]')
+
+# Komunikaty błędów walidacji/logowania
+_ERR_PHONE_REQUIRED = "Numer telefonu jest wymagany"
+_ERR_PHONE_SHORT = "Numer telefonu jest za krótki"
+_ERR_PHONE_LONG = "Numer telefonu jest za długi"
+_ERR_PWD_REQUIRED = "Hasło jest wymagane"
+_ERR_PWD_SHORT = "Hasło jest za krótkie"
+_ERR_CONN = "Błąd połączenia: %s"
 
 
 class LoginScreenError(Exception):
@@ -44,77 +56,78 @@ class LoginScreen(MDScreen):
         self.secure_text_entry = True
 
         # Validation state
-        self.validation_errors = {}
+        self._phone_error = None
+        self._pwd_error = None
+        self._last_phone_err_msg = None
+        self._last_pwd_err_msg = None
         self.login_attempts = 0
         self.max_login_attempts = 5
+        # Referencja do zadania logowania - niezreferowane zadanie może zebrać GC
+        self._login_task = None
 
         # Error handling state
         self.is_initialized = False
         self.error_count = 0
         self.max_errors = 10
 
+        # Walidacja w trakcie pisania - uruchamiana 150 ms po ostatnim znaku
+        self._phone_validate_ev = Clock.create_trigger(self._validate_phone_input, 0.15)
+        self._pwd_validate_ev = Clock.create_trigger(self._validate_password_input, 0.15)
+
+        # Widgety tworzone w build_ui
+        self.phone_field = None
+        self.password_field = None
+        self.toggle_password_btn = None
+        self.error_label = None
+        self.login_button = None
+        self.progress_bar = None
+
         try:
             self.build_ui()
             self.is_initialized = True
-            # Load saved credentials after UI is ready
-            Clock.schedule_once(self.safe_load_saved_credentials, 0.1)
+            # Load saved credentials off the UI thread (keyring = IPC)
+            threading.Thread(target=self._load_credentials_bg,
+                             daemon=True).start()
         except Exception as e:
-            Logger.error(f"Failed to initialize LoginScreen: {e}")
+            Logger.error("Failed to initialize LoginScreen: %s", e)
             self.show_error("Błąd inicjalizacji ekranu logowania")
 
     def validate_phone(self, phone: str) -> bool:
-        """Validate phone number format with error handling"""
-        try:
-            if not phone or len(phone.strip()) == 0:
-                msg = "Numer telefonu jest wymagany"
-                self.validation_errors['phone'] = msg
-                return False
+        """Validate phone number format"""
+        if not phone or len(phone.strip()) == 0:
+            self._phone_error = _ERR_PHONE_REQUIRED
+            return False
 
-            # Remove spaces and special characters
-            clean_phone = re.sub(r'[^\d+]', '', phone.strip())
+        # Remove spaces and special characters
+        clean_phone = _PHONE_CLEAN_RE.sub('', phone.strip())
 
-            if len(clean_phone) < 9:
-                msg = "Numer telefonu jest za krótki"
-                self.validation_errors['phone'] = msg
-                return False
+        if len(clean_phone) < 9:
+            self._phone_error = _ERR_PHONE_SHORT
+            return False
 
-            if len(clean_phone) > 15:
-                msg = "Numer telefonu jest za długi"
-                self.validation_errors['phone'] = msg
-                return False
+        if len(clean_phone) > 15:
+            self._phone_error = _ERR_PHONE_LONG
+            return False
 
-            # Clear validation error
-            if 'phone' in self.validation_errors:
-                del self.validation_errors['phone']
+        # Clear validation error
+        self._phone_error = None
 
-            return True
-        except Exception as e:
-            Logger.error(f"Phone validation error: {e}")
-            self.validation_errors['phone'] = "Błąd walidacji numeru"
-            return False
+        return True
 
     def validate_password(self, password: str) -> bool:
-        """Validate password with error handling"""
-        try:
-            if not password or len(password.strip()) == 0:
-                msg = "Hasło jest wymagane"
-                self.validation_errors['password'] = msg
-                return False
+        """Validate password"""
+        if not password or len(password.strip()) == 0:
+            self._pwd_error = _ERR_PWD_REQUIRED
+            return False
 
-            if len(password) < 3:
-                msg = "Hasło jest za krótkie"
-                self.validation_errors['password'] = msg
-                return False
+        if len(password) < 3:
+            self._pwd_error = _ERR_PWD_SHORT
+            return False
 
-            # Clear validation error
-            if 'password' in self.validation_errors:
-                del self.validation_errors['password']
+        # Clear validation error
+        self._pwd_error = None
 
-            return True
-        except Exception as e:
-            Logger.error(f"Password validation error: {e}")
-            self.validation_errors['password'] = "Błąd walidacji hasła"
-            return False
+        return True
 
     def validate_form(self) -> bool:
         """Validate entire form and update UI"""
@@ -127,41 +140,42 @@ class LoginScreen(MDScreen):
 
             return phone_valid and password_valid
         except Exception as e:
-            Logger.error(f"Form validation error: {e}")
+            Logger.error("Form validation error: %s", e)
             return False
 
     def update_validation_ui(self):
         """Update UI to show validation errors"""
-        try:
-            if not self.is_initialized:
-                return
-
-            self.update_field_references()
-
-            # Update phone field
-            if 'phone' in self.validation_errors:
-                if hasattr(self, 'phone_field'):
-                    self.phone_field.error = True
-                    msg = self.validation_errors['phone']
-                    self.phone_field.helper_text = msg
-            else:
-                if hasattr(self, 'phone_field'):
-                    self.phone_field.error = False
-                    self.phone_field.helper_text = ""
-
-            # Update password field
-            if 'password' in self.validation_errors:
-                if hasattr(self, 'password_field'):
-                    self.password_field.error = True
-                    msg = self.validation_errors['password']
-                    self.password_field.helper_text = msg
-            else:
-                if hasattr(self, 'password_field'):
-                    self.password_field.error = False
-                    self.password_field.helper_text = ""
-
-        except Exception as e:
-            Logger.error(f"UI validation update error: {e}")
+        self._update_phone_validation_ui()
+        self._update_password_validation_ui()
+
+    def _update_phone_validation_ui(self):
+        """Show phone validation error (phone field only)"""
+        if not self.is_initialized:
+            return
+
+        # Nic się nie zmieniło - bez zapisu właściwości
+        new_msg = self._phone_error
+        if new_msg == self._last_phone_err_msg:
+            return
+        self._last_phone_err_msg = new_msg
+
+        if self.phone_field is not None:
+            self.phone_field.error = new_msg is not None
+            self.phone_field.helper_text = new_msg or ""
+
+    def _update_password_validation_ui(self):
+        """Show password validation error (password field only)"""
+        if not self.is_initialized:
+            return
+
+        new_msg = self._pwd_error
+        if new_msg == self._last_pwd_err_msg:
+            return
+        self._last_pwd_err_msg = new_msg
+
+        if self.password_field is not None:
+            self.password_field.error = new_msg is not None
+            self.password_field.helper_text = new_msg or ""
 
     def build_ui(self):
         """Build user interface with error handling"""
@@ -170,7 +184,8 @@ class LoginScreen(MDScreen):
             main_layout = MDBoxLayout(
                 orientation='vertical',
                 spacing='20dp',
-                adaptive_height=True,
+                size_hint_y=None,
+                height='520dp',
                 pos_hint={'center_x': 0.5, 'center_y': 0.5}
             )
 
@@ -206,7 +221,8 @@ class LoginScreen(MDScreen):
             card_layout = MDBoxLayout(
                 orientation='vertical',
                 spacing='15dp',
-                adaptive_height=True
+                size_hint_y=None,
+                height='301dp'
             )
 
             # Title
@@ -229,7 +245,7 @@ class LoginScreen(MDScreen):
                 size_hint_y=None,
                 height='56dp'
             )
-            self.phone_field.bind(text=self.on_phone_change)
+            self.phone_field.fbind('text', self.on_phone_change)
             card_layout.add_widget(self.phone_field)
 
             # Password container
@@ -246,7 +262,7 @@ class LoginScreen(MDScreen):
                 password=True,
                 icon_right='eye-off'
             )
-            self.password_field.bind(text=self.on_password_change)
+            self.password_field.fbind('text', self.on_password_change)
 
             # Password toggle button
             self.toggle_password_btn = MDIconButton(
@@ -292,95 +308,116 @@ class LoginScreen(MDScreen):
             self.add_widget(main_layout)
 
         except Exception as e:
-            Logger.error(f"UI build error: {e}")
+            Logger.error("UI build error: %s", e)
             raise LoginScreenError(f"Failed to build UI: {e}")
 
-    def safe_load_saved_credentials(self, dt):
-        """Safely load saved credentials with error handling"""
+    def _load_credentials_bg(self):
+        """Read saved credentials from keyring (worker thread)"""
         try:
-            phone = keyring.get_password("taxi_driver", "phone")
-            password = keyring.get_password("taxi_driver", "password")
+            # Shared keyring cache in APIService - cleared on logout
+            phone, password = self.api_service.read_saved_credentials()
+        except Exception as e:
+            Logger.error("Error loading saved credentials: %s", e)
+            # Continue without saved credentials
+            return
+        Clock.schedule_once(
+            partial(self._apply_loaded_credentials, phone, password), 0)
 
+    def _apply_loaded_credentials(self, phone, password, dt=None):
+        """Fill the form with loaded credentials (main thread)"""
+        try:
             if phone and password:
                 self.phone = phone
                 self.password = password
-                if hasattr(self, 'phone_field'):
+                if self.phone_field is not None:
                     self.phone_field.text = phone
-                if hasattr(self, 'password_field'):
+                if self.password_field is not None:
                     self.password_field.text = password
                 Logger.info("Loaded saved credentials successfully")
             else:
                 Logger.info("No saved credentials found")
 
         except Exception as e:
-            Logger.error(f"Error loading saved credentials: {e}")
-            # Continue without saved credentials
+            Logger.error("Error applying saved credentials: %s", e)
 
     def on_phone_change(self, instance, value):
-        """Handle phone input changes with error handling"""
-        try:
-            self.phone = value
-            self.error_label.text = ""
-            # Validate on change for immediate feedback
-            if value:
-                self.validate_phone(value)
-                self.update_validation_ui()
-        except Exception as e:
-            Logger.error(f"Phone change error: {e}")
+        """Handle phone input changes"""
+        self.phone = value
+        self.error_label.text = ""
+        # Validate once typing pauses
+        self._phone_validate_ev.cancel()
+        self._phone_validate_ev()
 
     def on_password_change(self, instance, value):
-        """Handle password input changes with error handling"""
-        try:
-            self.password = value
-            self.error_label.text = ""
-            # Validate on change for immediate feedback
-            if value:
-                self.validate_password(value)
-                self.update_validation_ui()
-        except Exception as e:
-            Logger.error(f"Password change error: {e}")
+        """Handle password input changes"""
+        self.password = value
+        self.error_label.text = ""
+        # Validate once typing pauses
+        self._pwd_validate_ev.cancel()
+        self._pwd_validate_ev()
+
+    def _validate_phone_input(self, dt):
+        """Debounced phone validation"""
+        if self.phone:
+            self.validate_phone(self.phone)
+        else:
+            # Puste pole - bez komunikatu "wymagane" w trakcie edycji, stary błąd znika
+            self._phone_error = None
+        self._update_phone_validation_ui()
+
+    def _validate_password_input(self, dt):
+        """Debounced password validation"""
+        if self.password:
+            self.validate_password(self.password)
+        else:
+            self._pwd_error = None
+        self._update_password_validation_ui()
 
     def safe_toggle_password_visibility(self, instance=None):
         """Safely toggle password visibility"""
         try:
-            self.update_field_references()
-            if hasattr(self, 'password_field'):
+            if self.password_field is not None:
                 self.secure_text_entry = not self.secure_text_entry
                 self.password_field.password = self.secure_text_entry
 
-                if hasattr(self, 'toggle_password_btn'):
+                if self.toggle_password_btn is not None:
                     icon = "eye-off" if self.secure_text_entry else "eye"
                     self.toggle_password_btn.icon = icon
 
         except Exception as e:
-            Logger.error(f"Password visibility toggle error: {e}")
+            Logger.error("Password visibility toggle error: %s", e)
 
     def set_loading(self, loading: bool):
         """Set loading state with error handling"""
         try:
             self.is_loading = loading
-            if hasattr(self, 'login_button'):
+            if self.login_button is not None:
                 self.login_button.disabled = loading
 
-            if hasattr(self, 'progress_bar'):
+            if self.progress_bar is not None:
                 self.progress_bar.opacity = 1 if loading else 0
 
         except Exception as e:
-            Logger.error(f"Loading state error: {e}")
+            Logger.error("Loading state error: %s", e)
 
     def set_error(self, error_message: str):
         """Set error message with error handling"""
         try:
             self.error = error_message
-            if hasattr(self, 'error_label'):
+            if self.error_label is not None:
                 self.error_label.text = error_message
-            Logger.warning(f"Login error displayed: {error_message}")
+            if error_message:
+                Logger.warning("Login error displayed: %s", error_message)
         except Exception as e:
-            Logger.error(f"Error display error: {e}")
+            Logger.error("Error display error: %s", e)
 
     def safe_handle_login(self, instance=None):
         """Safely handle login with comprehensive error handling"""
         try:
+            # Login already in flight
+            if self.is_loading:
+                return
+
             # Validate form first
             if not self.validate_form():
                 return
@@ -394,33 +431,22 @@ class LoginScreen(MDScreen):
             self.set_error('')
             self.set_loading(True)
 
-            # Run login in thread to prevent UI blocking
-            threading.Thread(
-                target=self._perform_login,
-                daemon=True
-            ).start()
+            # Run login on the app event loop (UI updates stay on this thread)
+            self._login_task = asyncio.get_running_loop().create_task(
+                self._perform_login())
 
         except Exception as e:
-            Logger.error(f"Login handling error: {e}")
+            Logger.error("Login handling error: %s", e)
             self.set_loading(False)
             self.set_error("Błąd podczas logowania")
 
-    def _perform_login(self):
+    async def _perform_login(self):
         """Perform actual login with error handling"""
         try:
-            # Call API service
-            result = asyncio.run(
-                self.api_service.login(self.phone, self.password)
-            )            # Schedule UI updates on main thread
+            # Call API service (zapis danych logowania robi APIService)
+            result = await self.api_service.login(self.phone, self.password)
+            # Schedule UI updates on main thread
             if result.get('success'):
-                # Save credentials on successful login
-                try:
-                    keyring.set_password("taxi_driver", "phone", self.phone)
-                    keyring.set_password("taxi_driver", "password",
-                                         self.password)
-                except Exception as save_error:
-                    Logger.warning(f"Failed to save credentials: {save_error}")
-
                 Clock.schedule_once(
                     lambda dt: self._handle_login_success(result), 0
                 )
@@ -435,16 +461,14 @@ class LoginScreen(MDScreen):
                 lambda dt: self._handle_login_exception(error_message), 0
             )
 
-        # Always reset loading state
-        Clock.schedule_once(lambda dt: self.set_loading(False), 0)
-
     def _handle_login_success(self, result):
         """Handle successful login"""
+        self._apply_post_login_ui(False, "")
         try:
             self.reset_login_attempts()
             self.on_login_success(result)
         except Exception as e:
-            Logger.error(f"Login success handling error: {e}")
+            Logger.error("Login success handling error: %s", e)
 
     def _handle_login_error(self, result):
         """Handle login error response"""
@@ -452,35 +476,52 @@ class LoginScreen(MDScreen):
             self.login_attempts += 1
             default_msg = "Nie udało się zalogować. Sprawdź dane logowania."
             error_message = result.get('message', default_msg)
-            Logger.error(f"Login error: {error_message}")
-            self.set_error(error_message)
+            Logger.error("Login error: %s", error_message)
+            self._apply_post_login_ui(False, error_message)
         except Exception as e:
-            Logger.error(f"Login error handling error: {e}")
-            self.set_error("Błąd podczas przetwarzania odpowiedzi")
+            Logger.error("Login error handling error: %s", e)
+            self._apply_post_login_ui(
+                False, "Błąd podczas przetwarzania odpowiedzi")
 
     def _handle_login_exception(self, error_message):
         """Handle login exception"""
         try:
             self.login_attempts += 1
-            Logger.error(f"Login exception: {error_message}")
-            self.set_error(f'Błąd połączenia: {error_message}')
+            Logger.error("Login exception: %s", error_message)
+            self._apply_post_login_ui(False, _ERR_CONN % error_message)
+        except Exception as e:
+            Logger.error("Exception handling error: %s", e)
+            self._apply_post_login_ui(False, "Nieoczekiwany błąd")
+
+    def _apply_post_login_ui(self, loading: bool, error: str):
+        """Set loading and error state in one pass after login"""
+        try:
+            self.is_loading = loading
+            self.error = error
+            if self.login_button is not None:
+                self.login_button.disabled = loading
+            if self.progress_bar is not None:
+                self.progress_bar.opacity = 1 if loading else 0
+            if self.error_label is not None and self.error_label.text != error:
+                self.error_label.text = error
+            if error:
+                Logger.warning("Login error displayed: %s", error)
         except Exception as e:
-            Logger.error(f"Exception handling error: {e}")
-            self.set_error("Nieoczekiwany błąd")
+            Logger.error("Post-login UI error: %s", e)
 
     def reset_login_attempts(self):
         """Reset login attempts counter"""
         try:
             self.login_attempts = 0
         except Exception as e:
-            Logger.error(f"Reset login attempts error: {e}")
+            Logger.error("Reset login attempts error: %s", e)
 
     def show_error(self, message: str):
         """Show error message with fallback"""
         try:
             self.set_error(message)
         except Exception as e:
-            Logger.error(f"Show error failed: {e}")
+            Logger.error("Show error failed: %s", e)
             # Last resort error display
             print(f"ERROR: {message}")
 
@@ -489,14 +530,17 @@ class LoginScreen(MDScreen):
         try:
             self.phone = ""
             self.password = ""
-            self.validation_errors = {}
+            self._phone_error = None
+            self._pwd_error = None
+            self._last_phone_err_msg = None
+            self._last_pwd_err_msg = None
 
-            if hasattr(self, 'phone_field'):
+            if self.phone_field is not None:
                 self.phone_field.text = ""
                 self.phone_field.error = False
                 self.phone_field.helper_text = ""
 
-            if hasattr(self, 'password_field'):
+            if self.password_field is not None:
                 self.password_field.text = ""
                 self.password_field.error = False
                 self.password_field.helper_text = ""
@@ -504,38 +548,16 @@ class LoginScreen(MDScreen):
             self.set_error("")
 
         except Exception as e:
-            Logger.error(f"Clear form error: {e}")
-
-    def update_field_references(self):
-        """Update field references safely"""
-        try:
-            # Ensure field references are current
-            if not hasattr(self, 'phone_field'):
-                # Try to find phone field in children
-                for child in self.walk():
-                    if hasattr(child, 'hint_text'):
-                        if 'telefon' in child.hint_text.lower():
-                            self.phone_field = child
-                            break
-
-            if not hasattr(self, 'password_field'):
-                # Try to find password field in children
-                for child in self.walk():
-                    if hasattr(child, 'hint_text'):
-                        if 'hasło' in child.hint_text.lower():
-                            self.password_field = child
-                            break
-
-        except Exception as e:
-            Logger.error(f"Field reference update error: {e}")
+            Logger.error("Clear form error: %s", e)
 
     def cleanup(self):
         """Clean up resources safely"""
         try:
             self.clear_form()
             self.reset_login_attempts()
-            self.validation_errors = {}
+            self._phone_error = None
+            self._pwd_error = None
             self.error_count = 0
             Logger.info("LoginScreen cleanup completed")
         except Exception as e:
-            Logger.error(f"LoginScreen cleanup error: {e}")
+            Logger.error("LoginScreen cleanup error: %s", e)
@@ -5,8 +5,14 @@ Z dodanym lepszym error handlingiem
 """
 
 import asyncio
+import collections
+import math
+import os
+import random
 import traceback
 import time
+from dataclasses import dataclass
+from functools import wraps
 from kivy.event import EventDispatcher
 from kivy.clock import Clock
 from kivy.logger import Logger
@@ -21,37 +27,98 @@ except ImportError as e:
     Logger.warning(f"Plyer GPS not available: {e}. Using simulated location.")
 
 
+# Symulacja: punkt bazowy (Warszawa) i bufor przesunięć losowanych raz przy starcie
+SIMULATION_BASE = (52.2297, 21.0122)
+SIMULATION_WALK_SIZE = 4096
+
+# Parametry GPS (minTime ms, minDistance m) - na pierwszym planie i w tle
+GPS_FOREGROUND_PARAMS = (1000, 1)
+GPS_BACKGROUND_PARAMS = (300000, 50)
+
+# Statusy kierowcy, w których lokalizacja jest wysyłana do serwera
+UPLOAD_STATUSES = frozenset(('online', 'busy'))
+
+# Stopnie szerokości geograficznej na metr (przybliżenie)
+DEGREES_PER_METER = 1.0 / 111000.0
+
+
 class LocationServiceError(Exception):
     """Custom exception for location service errors"""
     pass
 
 
+@dataclass(frozen=True)
+class Location:
+    """Pojedynczy odczyt lokalizacji - niezmienny, więc przekazywany bez kopiowania"""
+    __slots__ = ('latitude', 'longitude', 'accuracy', 'timestamp')
+
+    latitude: float
+    longitude: float
+    accuracy: float
+    timestamp: float
+
+
 class LocationService(EventDispatcher):
     """Usługa obsługi lokalizacji GPS z error handlingiem"""
 
-    def __init__(self):
+    def __init__(self, api_service=None, cache_path=None):
         super().__init__()
+        self.api_service = api_service
+        # Epoka lokalizacji - zwiększana przy każdym nowym odczycie, unieważnia cache
+        self._loc_epoch = 0
+        self._loc_cached_epoch = -1
+        self._loc_cached = None
+        # Ostatnia lokalizacja zapisywana na dysk (najwyżej raz na sekundę)
+        self._cache_path = cache_path
+        self._cache_dirty = False
+        self._cache_event = None
         self.last_known_location = None
+        self._load_cached_location()
         self.is_tracking = False
-        self.location_listeners = []
+        # Słownik jako uporządkowany zbiór: O(1) dodawanie/usuwanie, zachowana kolejność
+        self.location_listeners = {}
+        # Migawka listenerów do wywołań - przebudowywana tylko przy zmianie listy
+        self._listener_snapshot = ()
         self.gps_event = None
         self.simulation_event = None
+        self._is_foreground = True
         self.error_count = 0
         self.max_errors = 10
         self.last_error = None
 
+        # Przesunięcia symulacji (~100m) - liczone raz, odczytywane cyklicznie
+        self._walk = [
+            (random.uniform(-0.001, 0.001), random.uniform(-0.001, 0.001))
+            for _ in range(SIMULATION_WALK_SIZE)
+        ]
+        self._walk_index = 0
+        # Funkcje wywoływane co odczyt - związane raz
+        self._time = time.time
+
         # Symulowana lokalizacja (Warszawa)
-        self.simulated_location = {
-            'latitude': 52.2297,
-            'longitude': 21.0122,
-            'accuracy': 10.0,
-            'timestamp': time.time()
-        }
+        self.simulated_location = Location(SIMULATION_BASE[0], SIMULATION_BASE[1], 10.0, time.time())
 
         # Error handling settings
         self.location_timeout = 30  # seconds
         self.update_interval = 5    # seconds
 
+        # Wysyłka lokalizacji do serwera paczkami zamiast zapytania na każdy odczyt
+        self._pending_locations = collections.deque(maxlen=200)
+        # Status kierowcy czekający na wysyłkę razem z punktami
+        self._pending_status = None
+        # Bieżący status kierowcy - punkty buforowane tylko online/busy
+        self.driver_status = 'offline'
+        self.batch_size = 20
+        self.flush_interval = 30    # seconds
+        self._flush_event = None
+
+        # Zdarzenia zegara tworzone raz i wznawiane przy każdym starcie śledzenia
+        self._simulation_trigger = Clock.create_trigger(
+            self._safe_callback(self._update_simulated_location), 10, interval=True
+        )
+        self._flush_trigger = Clock.create_trigger(self._flush_locations, self.flush_interval, interval=True)
+        self._cache_trigger = Clock.create_trigger(self._save_cached_location, 1, interval=True)
+
         try:
             # Rejestruj typ eventu
             self.register_event_type('on_location_update')
@@ -74,7 +141,7 @@ class LocationService(EventDispatcher):
         self.error_count += 1
         self.last_error = error
         
-        Logger.error(f"Location service error ({self.error_count}): {error}")
+        Logger.error("Location service error (%d): %s", self.error_count, error)
         
         if self.error_count >= self.max_errors:
             Logger.error("Too many location errors, stopping tracking")
@@ -92,41 +159,34 @@ class LocationService(EventDispatcher):
             Logger.info("Falling back to simulated location due to GPS errors")
             self.start_simulated_location()
 
-    def validate_location_data(self, location_data: dict) -> bool:
-        """Validate location data"""
+    def _safe_callback(self, callback):
+        """Opakuj callback GPS/zegara - jedyne miejsce obsługi błędów ścieżki odczytu"""
+        @wraps(callback)
+        def wrapper(*args, **kwargs):
+            try:
+                return callback(*args, **kwargs)
+            except Exception as e:
+                Logger.error(f"Error in {callback.__name__}: {e}")
+                self.handle_location_error(e)
+        return wrapper
+
+    @staticmethod
+    def _valid_ll(lat: float, lon: float) -> bool:
+        """Szybka walidacja współrzędnych (NaN odpada na porównaniach, inf na isfinite)"""
+        return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0 and math.isfinite(lat) and math.isfinite(lon)
+
+    @staticmethod
+    def validate_location_data(location: Location) -> bool:
+        """Validate location data (logowanie błędów po stronie wywołującego)"""
+        if not isinstance(location, Location):
+            return False
         try:
-            if not isinstance(location_data, dict):
-                return False
-
-            required_fields = ['latitude', 'longitude']
-            for field in required_fields:
-                if field not in location_data:
-                    Logger.warning(f"Missing required field: {field}")
-                    return False
-
-                value = location_data[field]
-                if not isinstance(value, (int, float)):
-                    Logger.warning(f"Invalid type for {field}: {type(value)}")
-                    return False
-
-            # Validate coordinate ranges
-            lat = location_data['latitude']
-            lon = location_data['longitude']
-
-            if not (-90 <= lat <= 90):
-                Logger.warning(f"Invalid latitude: {lat}")
-                return False
-
-            if not (-180 <= lon <= 180):
-                Logger.warning(f"Invalid longitude: {lon}")
-                return False
-
-            return True
-
-        except Exception as e:
-            Logger.error(f"Location validation error: {e}")
+            # Porównanie z nieliczbą rzuca TypeError
+            return LocationService._valid_ll(location.latitude, location.longitude)
+        except TypeError:
             return False
-      def start_location_updates(self):
+
+    def start_location_updates(self):
         """Rozpocznij śledzenie lokalizacji z error handlingiem"""
         try:
             if self.is_tracking:
@@ -136,11 +196,22 @@ class LocationService(EventDispatcher):
             self.is_tracking = True
             Logger.info("Starting location tracking...")
             
+            if not self._flush_event:
+                self._flush_trigger()
+                self._flush_event = self._flush_trigger
+            
+            if self._cache_path and not self._cache_event:
+                self._cache_trigger()
+                self._cache_event = self._cache_trigger
+            
             if HAS_GPS:
                 try:
                     # Spróbuj użyć prawdziwego GPS
-                    gps.configure(on_location=self._on_gps_location, on_status=self._on_gps_status)
-                    gps.start(minTime=1000, minDistance=1)  # Aktualizacja co 1s lub 1m
+                    gps.configure(
+                        on_location=self._safe_callback(self._on_gps_location),
+                        on_status=self._on_gps_status
+                    )
+                    self._start_gps()
                     Logger.info("GPS started successfully")
                 except Exception as e:
                     Logger.error(f"Failed to start GPS: {e}")
@@ -154,7 +225,36 @@ class LocationService(EventDispatcher):
             Logger.error(f"Critical error starting location updates: {e}")
             self.handle_location_error(e)
             raise LocationServiceError(f"Failed to start location updates: {e}")
-      def stop_location_updates(self):
+
+    def _start_gps(self):
+        """Uruchom GPS z częstotliwością zależną od tego, czy aplikacja jest na pierwszym planie"""
+        min_time, min_distance = GPS_FOREGROUND_PARAMS if self._is_foreground else GPS_BACKGROUND_PARAMS
+        gps.start(minTime=min_time, minDistance=min_distance)
+
+    def set_foreground(self, is_foreground: bool):
+        """Zmień częstotliwość GPS po przejściu aplikacji na pierwszy plan / w tło"""
+        if is_foreground == self._is_foreground:
+            return
+        self._is_foreground = is_foreground
+        Logger.info(f"Location updates switched to {'foreground' if is_foreground else 'background'} rate")
+        
+        if HAS_GPS and self.is_tracking and not self.simulation_event:
+            try:
+                gps.stop()
+                self._start_gps()
+            except Exception as e:
+                Logger.error(f"Failed to restart GPS: {e}")
+                self.handle_location_error(e)
+
+    def on_app_pause(self):
+        """Aplikacja przechodzi w tło"""
+        self.set_foreground(False)
+
+    def on_app_resume(self):
+        """Aplikacja wraca na pierwszy plan"""
+        self.set_foreground(True)
+
+    def stop_location_updates(self):
         """Zatrzymaj śledzenie lokalizacji z error handlingiem"""
         try:
             if not self.is_tracking:
@@ -175,18 +275,30 @@ class LocationService(EventDispatcher):
                 self.simulation_event.cancel()
                 self.simulation_event = None
                 Logger.info("Location simulation stopped")
+            
+            if self._flush_event:
+                self._flush_event.cancel()
+                self._flush_event = None
+            self._flush_locations()
+            
+            if self._cache_event:
+                self._cache_event.cancel()
+                self._cache_event = None
+            self._save_cached_location()
                 
         except Exception as e:
             Logger.error(f"Error stopping location updates: {e}")
             # Force stop tracking even if error occurred
             self.is_tracking = False
-      def _start_location_simulation(self):
+
+    def _start_location_simulation(self):
         """Uruchom symulację lokalizacji z error handlingiem"""
         try:
             Logger.info("Starting location simulation...")
             
             # Ustaw timestamp dla symulowanej lokalizacji
-            self.simulated_location['timestamp'] = time.time()
+            location = self.simulated_location
+            self.simulated_location = Location(location.latitude, location.longitude, location.accuracy, time.time())
             
             # Validate simulated location
             if not self.validate_location_data(self.simulated_location):
@@ -194,71 +306,69 @@ class LocationService(EventDispatcher):
                 raise LocationServiceError("Invalid simulated location data")
             
             # Ustaw jako ostatnią znaną lokalizację
-            self.last_known_location = self.simulated_location.copy()
+            self.last_known_location = self.simulated_location
             
             # Powiadom listenery o początkowej lokalizacji
             self._notify_location_listeners(self.simulated_location)
             
             # Uruchom regularne aktualizacje symulacji (co 10 sekund)
-            self.simulation_event = Clock.schedule_interval(self._update_simulated_location, 10)
+            self._simulation_trigger()
+            self.simulation_event = self._simulation_trigger
             Logger.info("Location simulation started successfully")
             
         except Exception as e:
             Logger.error(f"Failed to start location simulation: {e}")
             self.handle_location_error(e)
-      def _update_simulated_location(self, dt):
-        """Aktualizuj symulowaną lokalizację (małe ruchy) z error handlingiem"""
-        try:
-            import random
-            
-            # Dodaj małe losowe ruchy (symulacja jazdy)
-            lat_offset = random.uniform(-0.001, 0.001)  # ~100m
-            lon_offset = random.uniform(-0.001, 0.001)
-            
-            new_location = {
-                'latitude': 52.2297 + lat_offset,
-                'longitude': 21.0122 + lon_offset,
-                'accuracy': 10.0,
-                'timestamp': time.time()
-            }
-            
-            # Validate new location
-            if not self.validate_location_data(new_location):
-                Logger.warning("Invalid simulated location generated, using last known")
-                return
-            
-            self.simulated_location.update(new_location)
-            self.last_known_location = self.simulated_location.copy()
-            self._notify_location_listeners(self.simulated_location)
-            
-        except Exception as e:
-            Logger.error(f"Error updating simulated location: {e}")
-            self.handle_location_error(e)
-      def _on_gps_location(self, **kwargs):
-        """Callback dla rzeczywistej lokalizacji GPS z error handlingiem"""
-        try:
-            location = {
-                'latitude': kwargs.get('lat', 0.0),
-                'longitude': kwargs.get('lon', 0.0),
-                'accuracy': kwargs.get('accuracy', 0.0),
-                'timestamp': kwargs.get('timestamp', time.time())
-            }
-            
-            # Validate GPS location
-            if not self.validate_location_data(location):
-                Logger.warning("Invalid GPS location data received")
+
+    def _update_simulated_location(self, dt):
+        """Aktualizuj symulowaną lokalizację (małe ruchy) - błędy łapie _safe_callback"""
+        # Dodaj małe ruchy z bufora (symulacja jazdy) - przesunięcia są ograniczone,
+        # więc wynik zawsze mieści się w zakresie i nie wymaga walidacji
+        lat_offset, lon_offset = self._walk[self._walk_index]
+        self._walk_index = (self._walk_index + 1) % SIMULATION_WALK_SIZE
+        
+        location = Location(
+            SIMULATION_BASE[0] + lat_offset,
+            SIMULATION_BASE[1] + lon_offset,
+            10.0,
+            self._time()
+        )
+        
+        self.simulated_location = location
+        self.last_known_location = location
+        self._notify_location_listeners(location)
+
+    def _on_gps_location(self, **kwargs):
+        """Callback dla rzeczywistej lokalizacji GPS - błędy łapie _safe_callback"""
+        lat = kwargs.get('lat', 0.0)
+        lon = kwargs.get('lon', 0.0)
+        
+        # Walidacja przed zbudowaniem obiektu - plyer podaje zawsze liczby
+        if not self._valid_ll(lat, lon):
+            Logger.warning("Invalid GPS location data received")
+            return
+        
+        accuracy = kwargs.get('accuracy', 0.0)
+        
+        # Przesunięcie mniejsze niż dokładność odczytu to szum - pomijamy cały odczyt
+        last = self.last_known_location
+        if last is not None and accuracy:
+            d_lat = lat - last.latitude
+            d_lon = lon - last.longitude
+            radius = accuracy * DEGREES_PER_METER
+            if d_lat * d_lat + d_lon * d_lon < radius * radius:
                 return
-            
-            Logger.info(f"GPS location received: {location['latitude']}, {location['longitude']}")
-            
-            self.last_known_location = location
-            self.error_count = 0  # Reset error count on successful location
-            self._notify_location_listeners(location)
-            
-        except Exception as e:
-            Logger.error(f"Error processing GPS location: {e}")
-            self.handle_location_error(e)
-      def _on_gps_status(self, stype, status):
+        
+        timestamp = kwargs.get('timestamp')
+        location = Location(lat, lon, accuracy, timestamp if timestamp is not None else self._time())
+        
+        Logger.debug("GPS location received: %s, %s", lat, lon)
+        
+        self.last_known_location = location
+        self.error_count = 0  # Reset error count on successful location
+        self._notify_location_listeners(location)
+
+    def _on_gps_status(self, stype, status):
         """Callback dla statusu GPS z error handlingiem"""
         try:
             Logger.info(f"GPS status: {stype} - {status}")
@@ -274,27 +384,127 @@ class LocationService(EventDispatcher):
             Logger.error(f"Error processing GPS status: {e}")
 
     def _notify_location_listeners(self, location):
-        """Powiadom wszystkich listenerów o nowej lokalizacji z error handlingiem"""
-        try:
-            # Dispatch event
-            self.dispatch('on_location_update', location)
-            
-            # Notify all listeners
-            failed_listeners = []
-            for listener in self.location_listeners:
-                try:
-                    listener(location)
-                except Exception as e:
-                    Logger.error(f"Error in location listener: {e}")
-                    failed_listeners.append(listener)
-            
-            # Remove failed listeners
+        """Powiadom wszystkich listenerów o nowej lokalizacji (błędy listenerów izolowane)"""
+        # Dispatch event
+        self.dispatch('on_location_update', location)
+        
+        # Zbuforuj punkt do wysyłki paczką (kierowca offline nie wysyła lokalizacji)
+        if self.driver_status in UPLOAD_STATUSES:
+            self._pending_locations.append((
+                location.latitude,
+                location.longitude,
+                location.accuracy,
+                location.timestamp
+            ))
+            if len(self._pending_locations) >= self.batch_size:
+                self._flush_locations()
+        
+        # Notify all listeners
+        failed_listeners = None
+        for listener in self._listener_snapshot:
+            try:
+                listener(location)
+            except Exception as e:
+                Logger.error("Error in location listener: %s", e)
+                if failed_listeners is None:
+                    failed_listeners = []
+                failed_listeners.append(listener)
+        
+        # Remove failed listeners
+        if failed_listeners:
             for failed_listener in failed_listeners:
-                self.location_listeners.remove(failed_listener)
+                self.location_listeners.pop(failed_listener, None)
                 Logger.warning("Removed failed location listener")
-                
+            self._listener_snapshot = tuple(self.location_listeners)
+
+    def set_driver_status(self, status: str):
+        """Zapamiętaj status kierowcy lokalnie (bez wysyłki) - decyduje o buforowaniu punktów"""
+        self.driver_status = status
+
+    def update_driver_status(self, status: str):
+        """Zmień status kierowcy - wysyłany od razu razem z zaległymi punktami"""
+        self.set_driver_status(status)
+        self._pending_status = status
+        Clock.schedule_once(self._flush_locations, 0)
+
+    def _flush_locations(self, dt=None):
+        """Wyślij zbuforowane punkty (i oczekujący status) jednym zapytaniem na pętli aplikacji"""
+        if not self.api_service:
+            return
+        if not self._pending_locations and self._pending_status is None:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Brak pętli aplikacji (np. zamykanie) - punkty zostają w buforze
+            Logger.debug("No running event loop, location batch kept in buffer")
+            return
+        
+        points = list(self._pending_locations)
+        self._pending_locations.clear()
+        status = self._pending_status
+        self._pending_status = None
+        
+        # Ta sama pętla co UI i APIService - współdzielona sesja HTTP
+        loop.create_task(self._upload_locations(points, status))
+
+    async def _upload_locations(self, points, status=None):
+        """Wysyłka paczki punktów (zadanie na pętli aplikacji)"""
+        try:
+            result = await self.api_service.update_locations_batch(points, status)
+            if result.get('success'):
+                return
+            Logger.warning(f"Location batch upload failed: {result.get('message')}")
         except Exception as e:
-            Logger.error(f"Error notifying location listeners: {e}")
+            Logger.error(f"Location batch upload error: {e}")
+        
+        # Nieudana wysyłka - oddaj punkty do bufora
+        self._requeue_locations(points, status)
+
+    def _requeue_locations(self, points, status):
+        """Przywróć niewysłane punkty przed nowszymi (bufor ograniczony - najstarsze wypadają)"""
+        # Nowszy status ustawiony w międzyczasie ma pierwszeństwo
+        if status is not None and self._pending_status is None:
+            self._pending_status = status
+        newer = list(self._pending_locations)
+        self._pending_locations.clear()
+        self._pending_locations.extend(points)
+        self._pending_locations.extend(newer)
+
+    def _load_cached_location(self):
+        """Wczytaj ostatnią lokalizację zapisaną przed restartem aplikacji"""
+        if not self._cache_path or not os.path.exists(self._cache_path):
+            return
+        try:
+            with open(self._cache_path, 'r') as f:
+                location = Location(*json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            Logger.warning(f"Could not read cached location: {e}")
+            return
+        
+        if self.validate_location_data(location):
+            self.last_known_location = location
+            self._cache_dirty = False
+            Logger.info("Restored last known location from cache")
+
+    def _save_cached_location(self, dt=None, sync=False):
+        """Zapisz ostatnią lokalizację atomowo (plik tymczasowy + os.replace)"""
+        location = self.last_known_location
+        if not self._cache_dirty or not self._cache_path or location is None:
+            return
+        self._cache_dirty = False
+        
+        tmp_path = self._cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump([location.latitude, location.longitude, location.accuracy, location.timestamp], f)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            Logger.warning(f"Could not save cached location: {e}")
 
     def add_location_listener(self, listener):
         """Dodaj listener lokalizacji z error handlingiem"""
@@ -303,7 +513,8 @@ class LocationService(EventDispatcher):
                 raise ValueError("Listener must be callable")
                 
             if listener not in self.location_listeners:
-                self.location_listeners.append(listener)
+                self.location_listeners[listener] = None
+                self._listener_snapshot = tuple(self.location_listeners)
                 Logger.info(f"Added location listener. Total: {len(self.location_listeners)}")
             else:
                 Logger.warning("Location listener already exists")
@@ -315,7 +526,8 @@ class LocationService(EventDispatcher):
         """Usuń listener lokalizacji z error handlingiem"""
         try:
             if listener in self.location_listeners:
-                self.location_listeners.remove(listener)
+                del self.location_listeners[listener]
+                self._listener_snapshot = tuple(self.location_listeners)
                 Logger.info(f"Removed location listener. Remaining: {len(self.location_listeners)}")
             else:
                 Logger.warning("Location listener not found")
@@ -323,21 +535,36 @@ class LocationService(EventDispatcher):
         except Exception as e:
             Logger.error(f"Error removing location listener: {e}")
 
+    @property
+    def last_known_location(self):
+        return self._last_known_location
+
+    @last_known_location.setter
+    def last_known_location(self, location):
+        self._last_known_location = location
+        self._loc_epoch += 1
+        if location is not None:
+            self._cache_dirty = True
+
     def get_last_known_location(self):
-        """Pobierz ostatnią znaną lokalizację z error handlingiem"""
-        try:
-            if self.last_known_location:
-                # Validate before returning
-                if self.validate_location_data(self.last_known_location):
-                    return self.last_known_location.copy()
-                else:
-                    Logger.warning("Last known location is invalid")
-                    return None
-            return None
-            
-        except Exception as e:
-            Logger.error(f"Error getting last known location: {e}")
-            return None
+        """
+        Pobierz ostatnią znaną lokalizację z error handlingiem
+        Walidacja robiona raz na odczyt GPS; Location jest niezmienny, więc bez kopii
+        """
+        if self._loc_cached_epoch == self._loc_epoch:
+            return self._loc_cached
+        
+        location = None
+        if self.last_known_location is not None:
+            # Validate before returning
+            if self.validate_location_data(self.last_known_location):
+                location = self.last_known_location
+            else:
+                Logger.warning("Last known location is invalid")
+        
+        self._loc_cached = location
+        self._loc_cached_epoch = self._loc_epoch
+        return location
 
     def get_current_location(self):
         """Pobierz aktualną lokalizację z error handlingiem"""
@@ -412,7 +639,11 @@ class LocationService(EventDispatcher):
         try:
             Logger.info("Cleaning up LocationService...")
             self.stop_location_updates()
+            # Zapis z fsync - kolejny start aplikacji ma od czego zacząć
+            self._cache_dirty = self.last_known_location is not None
+            self._save_cached_location(sync=True)
             self.location_listeners.clear()
+            self._listener_snapshot = ()
             self.last_known_location = None
             self.error_count = 0
             self.last_error = None
@@ -422,4 +653,5 @@ class LocationService(EventDispatcher):
             Logger.error(f"Error during LocationService cleanup: {e}")
             # Force cleanup even if error occurred
             self.is_tracking = False
-            self.location_listeners = []
+            self.location_listeners = {}
+            self._listener_snapshot = ()
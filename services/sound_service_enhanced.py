@@ -6,8 +6,8 @@ Kompletny error handling i funkcjonalność
 import asyncio
 import os
 import time
-import traceback
-from typing import Dict, List, Optional, Any
+from functools import lru_cache, partial, partialmethod
+from typing import Callable, Dict, FrozenSet, List, Optional, Any
 from kivy.event import EventDispatcher
 from kivy.logger import Logger
 
@@ -28,8 +28,25 @@ except ImportError as e:
     Logger.warning(f"Kivy SoundLoader not available: {e}")
 
 
+def _noop() -> None:
+    """Play handler for mock/silent sounds"""
+
+
+@lru_cache(maxsize=16)
+def _list_files(assets_path: str) -> FrozenSet[str]:
+    """Names of regular files in assets_path, shared by all instances.
+
+    Raises OSError for a missing path or a non-directory (not cached).
+    """
+    # One directory pass; DirEntry.is_file() is cached from the scan
+    with os.scandir(assets_path) as it:
+        return frozenset(entry.name for entry in it if entry.is_file())
+
+
 class SoundServiceError(Exception):
     """Custom exception for sound service errors"""
+    __slots__ = ('sound_name', 'timestamp')
+    
     def __init__(self, message: str, sound_name: str = None):
         super().__init__(message)
         self.sound_name = sound_name
@@ -45,6 +62,12 @@ class SafeSoundService(EventDispatcher):
         # Core settings
         self.assets_path = assets_path or "assets/sounds"
         self.sounds: Dict[str, Any] = {}
+        # Per-sound play handler, kept in step with self.sounds
+        self._play: Dict[str, Callable[[], None]] = {}
+        # Kivy Sound objects only - the ones that have a volume
+        self._live_sounds: List[Any] = []
+        # filepath -> SoundLoader load, shared by names using the same file
+        self._by_path: Dict[str, "asyncio.Future"] = {}
         self.is_initialized = False
         self.volume = 1.0
         self.is_muted = False
@@ -53,7 +76,9 @@ class SafeSoundService(EventDispatcher):
         self.last_error: Optional[Exception] = None
         self.error_count = 0
         self.max_error_count = 10
-        self.failed_sounds: set = set()
+        self._errors_exhausted = False  # error_count >= max_error_count
+        self._failed_mask = 0  # bit per sound, see _name_to_bit
+        self._failed_list: List[str] = []
         self.initialization_attempts = 0
         self.max_init_attempts = 3
         
@@ -62,6 +87,14 @@ class SafeSoundService(EventDispatcher):
         self.success_count = 0
         self.last_play_time = 0
         
+        # Per-sound cooldown - repeats inside min_interval are dropped
+        self.min_interval = 0.05
+        self._last_fire: Dict[str, float] = {}
+        
+        # get_status memo (rebuilt only when the inputs change)
+        self._status_cache: Optional[Dict[str, Any]] = None
+        self._status_key = None
+        
         # Sound file mapping
         self.sound_files = {
             'new_order': 'new_order.wav',
@@ -74,6 +107,16 @@ class SafeSoundService(EventDispatcher):
             'shutdown': 'shutdown.wav'
         }
         
+        # Paths joined once; existence filled in by _validate_assets_path
+        self._sound_paths: Dict[str, str] = {
+            name: os.path.join(self.assets_path, filename)
+            for name, filename in self.sound_files.items()
+        }
+        self._sound_exists: Dict[str, bool] = dict.fromkeys(self.sound_files, False)
+        self._name_to_bit: Dict[str, int] = {
+            name: 1 << index for index, name in enumerate(self.sound_files)
+        }
+        
         Logger.info("SafeSoundService created, starting initialization...")
         self.safe_initialize()
     
@@ -89,6 +132,8 @@ class SafeSoundService(EventDispatcher):
         self.initialization_attempts += 1
         self.last_error = error
         self.error_count += 1
+        if self.error_count >= self.max_error_count:
+            self._errors_exhausted = True
         
         Logger.error(f"SoundService init error (attempt {self.initialization_attempts}): {error}")
         
@@ -128,100 +173,121 @@ class SafeSoundService(EventDispatcher):
     
     def _validate_assets_path(self) -> bool:
         """Validate assets path exists and is accessible"""
+        if not self.assets_path:
+            return False
+        
         try:
-            if not self.assets_path:
-                return False
-                
-            if not os.path.exists(self.assets_path):
-                Logger.warning(f"Assets path does not exist: {self.assets_path}")
-                return False
-                
-            if not os.path.isdir(self.assets_path):
-                Logger.warning(f"Assets path is not a directory: {self.assets_path}")
-                return False
-                
-            return True
-            
-        except Exception as error:
-            Logger.error(f"Error validating assets path: {error}")
+            files = _list_files(self.assets_path)
+        except OSError as error:
+            Logger.warning(f"Assets path not accessible: {self.assets_path} ({error})")
             return False
+        
+        self._sound_exists = {
+            name: filename in files
+            for name, filename in self.sound_files.items()
+        }
+        return True
     
     async def _load_sound_files(self) -> int:
         """Load sound files with error handling"""
         loaded_count = 0
         
-        for sound_name, filename in self.sound_files.items():
-            try:
-                if await self._load_single_sound(sound_name, filename):
-                    loaded_count += 1
-                else:
-                    self.failed_sounds.add(sound_name)
-                    
-            except Exception as error:
-                Logger.error(f"Error loading sound {sound_name}: {error}")
-                self.failed_sounds.add(sound_name)
+        # Load all files concurrently
+        names = list(self.sound_files)
+        results = await asyncio.gather(
+            *[self._load_single_sound(name, self.sound_files[name]) for name in names],
+            return_exceptions=True
+        )
+        
+        for sound_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                Logger.error(f"Error loading sound {sound_name}: {result}")
+                self._mark_failed(sound_name)
+            elif result:
+                loaded_count += 1
+            else:
+                self._mark_failed(sound_name)
         
         # Create fallbacks for failed sounds
-        for failed_sound in self.failed_sounds:
-            self.sounds[failed_sound] = "mock_sound"
-            Logger.info(f"Created mock fallback for: {failed_sound}")
+        if self._failed_mask:
+            self.sounds.update(dict.fromkeys(self._failed_list, "mock_sound"))
+            self._play.update(dict.fromkeys(self._failed_list, _noop))
+            Logger.info(f"Created mock fallbacks for: {', '.join(self._failed_list)}")
         
         return loaded_count
     
     async def _load_single_sound(self, sound_name: str, filename: str) -> bool:
         """Load a single sound file"""
         try:
-            filepath = os.path.join(self.assets_path, filename)
+            filepath = self._sound_paths[sound_name]
             
-            if not os.path.exists(filepath):
+            if not self._sound_exists[sound_name]:
                 Logger.warning(f"Sound file does not exist: {filepath}")
                 return False
             
             # Try Kivy SoundLoader first
             if HAS_KIVY_AUDIO:
-                sound = await self._load_with_kivy(filepath)
+                # Loads run concurrently, so share the in-flight future
+                load = self._by_path.get(filepath)
+                shared = load is not None
+                if not shared:
+                    load = asyncio.ensure_future(self._load_with_kivy(filepath))
+                    self._by_path[filepath] = load
+                sound = await load
                 if sound:
                     self.sounds[sound_name] = sound
-                    Logger.info(f"Loaded with Kivy: {sound_name}")
+                    self._play[sound_name] = sound.play
+                    if not shared:
+                        self._live_sounds.append(sound)
+                    Logger.debug("Loaded with Kivy: %s", sound_name)
                     return True
             
             # Fallback to file path storage
             self.sounds[sound_name] = filepath
-            Logger.info(f"Stored file path: {sound_name}")
+            self._play[sound_name] = partial(audio.play, filepath) if HAS_PLYER_AUDIO else _noop
+            Logger.debug("Stored file path: %s", sound_name)
             return True
             
-        except Exception as error:
-            Logger.error(f"Error loading {sound_name}: {error}")
+        except Exception:
+            Logger.exception("Error loading %s", sound_name)
             return False
     
     async def _load_with_kivy(self, filepath: str):
         """Load sound with Kivy SoundLoader"""
         try:
-            sound = SoundLoader.load(filepath)
+            loop = asyncio.get_running_loop()
+            sound = await loop.run_in_executor(None, SoundLoader.load, filepath)
             if sound:
                 sound.volume = self.volume
                 return sound
             return None
             
-        except Exception as error:
-            Logger.error(f"Kivy SoundLoader error: {error}")
+        except Exception:
+            Logger.exception("Kivy SoundLoader error")
             return None
     
     def _create_mock_sounds(self) -> None:
         """Create mock sounds for testing"""
-        for sound_name in self.sound_files.keys():
-            self.sounds[sound_name] = "mock_sound"
+        self.sounds.update(dict.fromkeys(self.sound_files, "mock_sound"))
+        self._play.update(dict.fromkeys(self.sound_files, _noop))
         Logger.info("Created mock sounds for all sound types")
     
     def _create_silent_mode(self) -> None:
         """Create silent mode when all else fails"""
-        for sound_name in self.sound_files.keys():
-            self.sounds[sound_name] = "silent"
+        self.sounds.update(dict.fromkeys(self.sound_files, "silent"))
+        self._play.update(dict.fromkeys(self.sound_files, _noop))
         self.is_initialized = True
         Logger.info("Initialized in silent mode")
     
     async def safe_play_sound(self, sound_name: str) -> bool:
-        """Safe sound playing with comprehensive error handling"""
+        """Awaitable wrapper around play_sound_sync"""
+        return self.play_sound_sync(sound_name)
+    
+    # Hot path: globals pre-bound as default args (_time, _logger) so the
+    # lookups are locals. Not part of the call signature - never pass them.
+    def play_sound_sync(self, sound_name: str,
+                        _time=time.time, _logger=Logger) -> bool:
+        """Safe sound playing with comprehensive error handling (no I/O, no await)"""
         try:
             # Validation
             if not self._validate_play_request(sound_name):
@@ -229,21 +295,28 @@ class SafeSoundService(EventDispatcher):
             
             # Check mute status
             if self.is_muted:
-                Logger.debug(f"Sound muted: {sound_name}")
+                _logger.debug("Sound muted: %s", sound_name)
+                return True
+            
+            # Skip duplicates of a sound that has just fired
+            now = _time()
+            if now - self._last_fire.get(sound_name, 0.0) < self.min_interval:
+                _logger.debug("Sound throttled: %s", sound_name)
                 return True
             
             # Track attempt
             self.play_count += 1
-            self.last_play_time = time.time()
+            self.last_play_time = now
             
             # Play sound
-            result = await self._execute_sound_play(sound_name)
+            result = self._execute_sound_play(sound_name)
             
             if result:
                 self.success_count += 1
-                Logger.debug(f"Successfully played: {sound_name}")
+                self._last_fire[sound_name] = now
+                _logger.debug("Successfully played: %s", sound_name)
             else:
-                Logger.warning(f"Failed to play: {sound_name}")
+                _logger.warning("Failed to play: %s", sound_name)
             
             return result
             
@@ -261,89 +334,69 @@ class SafeSoundService(EventDispatcher):
             return False
         
         if sound_name not in self.sounds:
-            Logger.warning(f"Sound not available: {sound_name}")
+            Logger.warning("Sound not available: %s", sound_name)
             return False
         
-        if self.error_count >= self.max_error_count:
+        if self._errors_exhausted:
             Logger.warning("Too many errors, sound disabled")
             return False
         
         return True
     
-    async def _execute_sound_play(self, sound_name: str) -> bool:
+    def _execute_sound_play(self, sound_name: str, _logger=Logger) -> bool:
         """Execute the actual sound playing"""
         try:
-            sound = self.sounds[sound_name]
-            
-            # Handle different sound types
-            if sound == "mock_sound":
-                Logger.info(f"🔊 Mock sound: {sound_name}")
-                return True
-            
-            if sound == "silent":
-                Logger.debug(f"🔇 Silent mode: {sound_name}")
-                return True
-            
-            # Try Kivy audio
-            if HAS_KIVY_AUDIO and hasattr(sound, 'play'):
-                sound.play()
-                Logger.info(f"🔊 Kivy audio: {sound_name}")
-                return True
-            
-            # Try Plyer audio
-            if HAS_PLYER_AUDIO and isinstance(sound, str) and os.path.exists(sound):
-                audio.play(sound)
-                Logger.info(f"🔊 Plyer audio: {sound_name}")
-                return True
-            
-            # Fallback to simulation
-            Logger.info(f"🔊 Simulated: {sound_name}")
+            # Handler chosen at load time: Kivy play / Plyer / no-op
+            self._play[sound_name]()
+            _logger.debug("🔊 Played: %s", sound_name)
             return True
             
-        except Exception as error:
-            Logger.error(f"Sound execution error: {error}")
+        except Exception:
+            _logger.exception("Sound execution error: %s", sound_name)
             return False
     
     def _handle_play_error(self, error: Exception, sound_name: str) -> bool:
         """Handle sound playing errors"""
         self.last_error = error
         self.error_count += 1
+        if self.error_count >= self.max_error_count:
+            self._errors_exhausted = True
         
-        Logger.error(f"Sound play error ({self.error_count}): {error}")
+        Logger.error("Sound play error (%d): %s", self.error_count, error)
         
         # Add to failed sounds
-        self.failed_sounds.add(sound_name)
+        self._mark_failed(sound_name)
         
         # Create fallback
         self.sounds[sound_name] = "mock_sound"
+        self._play[sound_name] = _noop
         
         return False
     
-    # === PUBLIC API METHODS ===
-    
-    async def play_new_order_sound(self) -> bool:
-        """Play new order notification sound"""
-        return await self.safe_play_sound('new_order')
-    
-    async def play_order_accepted_sound(self) -> bool:
-        """Play order accepted sound"""
-        return await self.safe_play_sound('order_accepted')
+    def _mark_failed(self, sound_name: str) -> None:
+        """Record a failed sound (mask for lookups, list for status)"""
+        bit = self._name_to_bit.get(sound_name, 0)
+        if bit and not self._failed_mask & bit:
+            self._failed_mask |= bit
+            self._failed_list.append(sound_name)
     
-    async def play_order_completed_sound(self) -> bool:
-        """Play order completed sound"""
-        return await self.safe_play_sound('order_completed')
-    
-    async def play_message_sound(self) -> bool:
-        """Play message notification sound"""
-        return await self.safe_play_sound('message')
+    @property
+    def failed_sounds(self) -> set:
+        """Names of failed sounds, rebuilt from the mask"""
+        return {
+            name for name, bit in self._name_to_bit.items()
+            if self._failed_mask & bit
+        }
     
-    async def play_notification_sound(self) -> bool:
-        """Play general notification sound"""
-        return await self.safe_play_sound('notification')
+    # === PUBLIC API METHODS ===
     
-    async def play_error_sound(self) -> bool:
-        """Play error sound"""
-        return await self.safe_play_sound('error')
+    # Awaitable shortcuts - return safe_play_sound's coroutine directly
+    play_new_order_sound = partialmethod(safe_play_sound, 'new_order')
+    play_order_accepted_sound = partialmethod(safe_play_sound, 'order_accepted')
+    play_order_completed_sound = partialmethod(safe_play_sound, 'order_completed')
+    play_message_sound = partialmethod(safe_play_sound, 'message')
+    play_notification_sound = partialmethod(safe_play_sound, 'notification')
+    play_error_sound = partialmethod(safe_play_sound, 'error')
     
     def set_volume(self, volume: float) -> bool:
         """Set volume with validation"""
@@ -362,18 +415,27 @@ class SafeSoundService(EventDispatcher):
             Logger.info(f"Volume set to: {self.volume}")
             return True
             
-        except Exception as error:
-            Logger.error(f"Error setting volume: {error}")
+        except Exception:
+            Logger.exception("Error setting volume")
             return False
     
+    def set_min_interval(self, seconds: float) -> bool:
+        """Set per-sound cooldown between repeated plays"""
+        if not isinstance(seconds, (int, float)) or seconds < 0:
+            Logger.warning("Invalid min interval")
+            return False
+        
+        self.min_interval = float(seconds)
+        Logger.info("Sound min interval set to: %s", self.min_interval)
+        return True
+    
     def _update_sounds_volume(self) -> None:
         """Update volume for all loaded sounds"""
         try:
-            for sound in self.sounds.values():
-                if HAS_KIVY_AUDIO and hasattr(sound, 'volume'):
-                    sound.volume = self.volume
-        except Exception as error:
-            Logger.error(f"Error updating sound volumes: {error}")
+            for sound in self._live_sounds:
+                sound.volume = self.volume
+        except Exception:
+            Logger.exception("Error updating sound volumes")
     
     def mute(self) -> None:
         """Mute all sounds"""
@@ -395,23 +457,35 @@ class SafeSoundService(EventDispatcher):
     
     def get_status(self) -> Dict[str, Any]:
         """Get service status information"""
-        return {
+        key = (
+            self.is_initialized, self.is_muted, self.volume, len(self.sounds),
+            self._failed_mask, self.error_count, self.play_count,
+            self.success_count
+        )
+        if key == self._status_key:
+            return dict(self._status_cache)
+        
+        self._status_key = key
+        self._status_cache = {
             'is_initialized': self.is_initialized,
             'is_muted': self.is_muted,
             'volume': self.volume,
             'sounds_loaded': len(self.sounds),
-            'failed_sounds': list(self.failed_sounds),
+            'failed_sounds': list(self._failed_list),
             'error_count': self.error_count,
             'play_count': self.play_count,
             'success_rate': (self.success_count / max(1, self.play_count)) * 100,
             'has_kivy_audio': HAS_KIVY_AUDIO,
             'has_plyer_audio': HAS_PLYER_AUDIO
         }
+        return dict(self._status_cache)
     
     def reset_error_count(self) -> None:
         """Reset error counter"""
         self.error_count = 0
-        self.failed_sounds.clear()
+        self._errors_exhausted = False
+        self._failed_mask = 0
+        self._failed_list.clear()
         Logger.info("Error count reset")
     
     def cleanup(self) -> None:
@@ -427,13 +501,18 @@ class SafeSoundService(EventDispatcher):
             
             # Clear data
             self.sounds.clear()
-            self.failed_sounds.clear()
+            self._play.clear()
+            self._live_sounds.clear()
+            self._by_path.clear()
+            self._failed_mask = 0
+            self._failed_list.clear()
             self.is_initialized = False
+            _list_files.cache_clear()
             
             Logger.info("SoundService cleaned up")
             
-        except Exception as error:
-            Logger.error(f"Cleanup error: {error}")
+        except Exception:
+            Logger.exception("Cleanup error")
 
 
 # Alias for backward compatibility